@@ -1,30 +1,26 @@
-
 import streamlit as st
 import pandas as pd
 import numpy as np
 import pickle
 import os
 import sys
-from PIL import Image
 import io
 import base64
 from datetime import datetime
 import shutil
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
 sys.path.append('utils')
 sys.path.append('.')
 
-try:
-    from utils.ocr_utils import OCRProcessor, validate_parameters, NORMAL_RANGES
-    from utils.report_generator import ReportGenerator
-    from model_training import load_model
-except ImportError:
-    from ocr_utils import OCRProcessor, validate_parameters, NORMAL_RANGES
-    from report_generator import ReportGenerator
-    from model_training import load_model
+from inference import get_model_holder, predict_cached
+from sensitivity import sensitivity_sweep
+
+def load_ocr_tools():
+    try:
+        from utils.ocr_utils import OCRProcessor, to_model_features, validate_parameters
+    except ImportError:
+        from ocr_utils import OCRProcessor, to_model_features, validate_parameters
+    return OCRProcessor, validate_parameters, to_model_features
 
 st.set_page_config(
     page_title="🏥 Cardiology Assessment Center - Heart Disease Prediction | By Shazim Javed",
@@ -386,10 +382,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
 def load_ml_model():
-    model, scaler, feature_names = load_model()
-    return model, scaler, feature_names
+    return get_model_holder().artifacts()
 
 def main():
     st.markdown("""
@@ -533,6 +527,17 @@ def show_about_page():
     st.dataframe(ranges_df, use_container_width=True, hide_index=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
+    
+    model_stats = get_model_holder().stats()
+    if model_stats['loaded']:
+        with st.expander("⚙️ Model Runtime"):
+            st.write(f"**Load time:** {model_stats['load_seconds'] * 1000:.1f} ms")
+            st.write(f"**Warm-up time:** {model_stats['warmup_seconds'] * 1000:.1f} ms")
+            st.write(f"**Memory footprint:** {model_stats['memory_bytes'] / 1024:.1f} KB")
+            if model_stats['cache']:
+                cache_stats = model_stats['cache']
+                st.write(f"**Prediction cache:** {cache_stats['entries']} entries, "
+                         f"{cache_stats['hit_rate']:.0%} hit rate, {cache_stats['evictions']} evictions")
 
 def show_manual_input_page():
     st.markdown("""
@@ -614,9 +619,18 @@ def show_manual_input_page():
         
         prediction_result, prediction_probability = make_prediction(user_data, model, scaler, feature_names)
         
-        display_enhanced_prediction_results(user_data, prediction_result, prediction_probability, patient_info)
+        sensitivity_curves = None
+        if prediction_result is not None:
+            try:
+                sensitivity_curves = sensitivity_sweep(user_data, model, scaler, feature_names)
+            except Exception as e:
+                st.warning(f"What-if analysis unavailable: {str(e)}")
+        
+        display_enhanced_prediction_results(user_data, prediction_result, prediction_probability, patient_info, sensitivity_curves)
 
 def show_image_upload_page():
+    from PIL import Image
+    
     st.markdown('<h2 class="sub-header">Upload Medical Report Image</h2>', unsafe_allow_html=True)
     
     model, scaler, feature_names = load_ml_model()
@@ -650,6 +664,7 @@ def show_image_upload_page():
                 return
             
             with st.spinner("Processing image and extracting parameters..."):
+                OCRProcessor, validate_parameters, to_model_features = load_ocr_tools()
                 ocr_processor = OCRProcessor()
                 
                 if not ocr_processor.test_ocr():
@@ -660,6 +675,8 @@ def show_image_upload_page():
                 
                 if result['success']:
                     st.success(result['message'])
+                    if result.get('cached'):
+                        st.caption("Reused the OCR result cached for this image")
                     
                     with st.expander("Extracted Text"):
                         st.text(result['extracted_text'])
@@ -680,8 +697,9 @@ def show_image_upload_page():
                                 st.warning(warning)
                         
                         if len(validated_params) >= 5:  # Minimum required parameters
+                            model_features = to_model_features(validated_params)
                             prediction_result, prediction_probability = make_prediction(
-                                validated_params, model, scaler, feature_names
+                                model_features, model, scaler, feature_names
                             )
                             
                             patient_info = {
@@ -689,7 +707,7 @@ def show_image_upload_page():
                                 'patient_id': patient_id.strip() if patient_id.strip() else "N/A"
                             }
                             
-                            display_prediction_results(validated_params, prediction_result, prediction_probability, patient_info)
+                            display_prediction_results(model_features, prediction_result, prediction_probability, patient_info)
                         else:
                             st.error("Insufficient parameters extracted. Please try with a clearer image or use manual input.")
                     else:
@@ -716,30 +734,69 @@ def show_image_upload_page():
 
 def make_prediction(user_data, model, scaler, feature_names):
     try:
-        feature_vector = []
-        for feature in feature_names:
-            if feature in user_data:
-                feature_vector.append(user_data[feature])
-            else:
-                feature_vector.append(0)
-        
-        X = np.array(feature_vector).reshape(1, -1)
-        
-        import pandas as pd
-        X_df = pd.DataFrame(X, columns=feature_names)
-        
-        X_scaled = scaler.transform(X_df)
-        
-        prediction = model.predict(X_scaled)[0]
-        probability = model.predict_proba(X_scaled)[0][1]
-        
-        return prediction, probability
+        return predict_cached(user_data, model, scaler, feature_names)
         
     except Exception as e:
         st.error(f"Error making prediction: {str(e)}")
         return None, None
 
-def display_enhanced_prediction_results(user_data, prediction_result, prediction_probability, patient_info=None):
+def display_sensitivity_curves(sensitivity_curves, prediction_probability):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    labels = {
+        'trestbps': 'Blood Pressure (mmHg)',
+        'chol': 'Cholesterol (mg/dL)',
+        'thalach': 'Max Heart Rate (bpm)',
+        'oldpeak': 'ST Depression',
+        'fbs': 'Fasting Blood Sugar > 120'
+    }
+    
+    parameters = list(sensitivity_curves)
+    fig_whatif = make_subplots(
+        rows=1,
+        cols=len(parameters),
+        shared_yaxes=True,
+        subplot_titles=[labels.get(p, p) for p in parameters]
+    )
+    
+    for col, parameter in enumerate(parameters, start=1):
+        curve = sensitivity_curves[parameter]
+        fig_whatif.add_trace(go.Scatter(
+            x=curve['values'],
+            y=curve['probabilities'] * 100,
+            mode='lines+markers' if len(curve['values']) <= 2 else 'lines',
+            line=dict(color='#667eea', width=3),
+            name=labels.get(parameter, parameter),
+            showlegend=False
+        ), row=1, col=col)
+        fig_whatif.add_trace(go.Scatter(
+            x=[curve['current']],
+            y=[prediction_probability * 100],
+            mode='markers',
+            marker=dict(color='#FFD700', size=12, line=dict(color='white', width=2)),
+            name='Current',
+            showlegend=col == 1
+        ), row=1, col=col)
+    
+    fig_whatif.update_yaxes(range=[0, 100], title_text='Risk (%)', row=1, col=1)
+    fig_whatif.update_layout(
+        title={
+            'text': '🔀 What-If Risk Curves',
+            'x': 0.5,
+            'font': {'size': 18, 'color': 'white'}
+        },
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=320
+    )
+    
+    st.plotly_chart(fig_whatif, use_container_width=True)
+
+def display_enhanced_prediction_results(user_data, prediction_result, prediction_probability, patient_info=None, sensitivity_curves=None):
+    import plotly.graph_objects as go
+    
     st.markdown("""
     <div style="text-align: center; padding: 1rem; background: rgba(255,255,255,0.1); border-radius: 10px; margin: 1rem 0;">
         <h3 style="color: white; margin: 0; font-size: 1.8rem;">🎯 AI Analysis Results</h3>
@@ -825,6 +882,9 @@ def display_enhanced_prediction_results(user_data, prediction_result, prediction
         
         st.plotly_chart(fig_gauge, use_container_width=True)
     
+    if sensitivity_curves:
+        display_sensitivity_curves(sensitivity_curves, prediction_probability)
+    
     st.markdown("""
     <div style="background: rgba(255,255,255,0.1); padding: 1.5rem; border-radius: 15px; margin: 2rem 0;">
         <h3 style="color: white; margin-top: 0;">📊 Health Parameters Analysis</h3>
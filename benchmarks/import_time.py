@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_BUDGET_MS = 2500
+
+DEFERRED_MODULES = [
+    'cv2',
+    'pytesseract',
+    'matplotlib',
+    'seaborn',
+    'reportlab',
+    'plotly.express',
+    'sklearn',
+    'xgboost',
+    'requests'
+]
+
+def run_importtime(statement):
+    code = f"{statement}\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return parse_importtime(result.stderr), loaded
+
+def parse_importtime(output):
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us, name = fields
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def package_breakdown(rows):
+    totals = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split('.')[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+def report(statement, top=15, budget_ms=STARTUP_BUDGET_MS):
+    rows, loaded = run_importtime(statement)
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    
+    print(f"\n{statement}")
+    print("-" * 60)
+    print(f"{'package':<30}{'self time (ms)':>16}{'share':>10}")
+    for package, self_us in package_breakdown(rows)[:top]:
+        print(f"{package:<30}{self_us / 1000:>16.1f}{self_us / max(total_us, 1):>10.1%}")
+    print("-" * 60)
+    print(f"{'total':<30}{total_us / 1000:>16.1f}")
+    
+    eager = [module for module in DEFERRED_MODULES if module in loaded]
+    within_budget = total_us / 1000 <= budget_ms
+    print(f"{'✅' if within_budget else '❌'} Budget {budget_ms} ms")
+    print(f"{'✅' if not eager else '❌'} Deferred modules loaded eagerly: {', '.join(eager) if eager else 'none'}")
+    
+    return {
+        'statement': statement,
+        'total_ms': total_us / 1000,
+        'budget_ms': budget_ms,
+        'eager_modules': eager,
+        'packages': [{'package': p, 'self_ms': us / 1000} for p, us in package_breakdown(rows)[:top]]
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budget report for the Streamlit app")
+    parser.add_argument('--statement', default='import app', help="Import statement to profile")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', dest='json_path', help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+    
+    result = report(args.statement, top=args.top, budget_ms=args.budget_ms)
+    
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+    
+    return 0 if result['total_ms'] <= args.budget_ms and not result['eager_modules'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
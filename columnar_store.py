@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+SCHEMA_FILE = 'schema.json'
+FORMAT_VERSION = 1
+
+def _column_array(series):
+    values = series.to_numpy()
+    if values.dtype == object:
+        values = values.astype(str)
+    return np.ascontiguousarray(values)
+
+def _start(path):
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    return tmp_path
+
+def _finish(tmp_path, path, columns, rows, metadata):
+    schema = {
+        'format_version': FORMAT_VERSION,
+        'rows': int(rows),
+        'columns': columns,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'metadata': metadata or {}
+    }
+    with open(os.path.join(tmp_path, SCHEMA_FILE), 'w') as f:
+        json.dump(schema, f, indent=2)
+    
+    old_path = path + '.old'
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    
+    return schema
+
+def write_columns(df, path, metadata=None):
+    tmp_path = _start(path)
+    
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = _column_array(df[name])
+        file_name = f"{i:04d}.npy"
+        np.save(os.path.join(tmp_path, file_name), values, allow_pickle=False)
+        columns.append({'name': str(name), 'file': file_name, 'dtype': values.dtype.str})
+    
+    return _finish(tmp_path, path, columns, len(df), metadata)
+
+def write_column_chunks(chunks, path, dtypes, n_rows, metadata=None):
+    tmp_path = _start(path)
+    
+    columns, arrays = [], {}
+    for i, (name, dtype) in enumerate(dtypes.items()):
+        file_name = f"{i:04d}.npy"
+        arrays[name] = np.lib.format.open_memmap(
+            os.path.join(tmp_path, file_name), mode='w+', dtype=np.dtype(dtype), shape=(n_rows,)
+        )
+        columns.append({'name': str(name), 'file': file_name, 'dtype': np.dtype(dtype).str})
+    
+    written = 0
+    for chunk in chunks:
+        end = written + len(chunk)
+        if end > n_rows:
+            raise ValueError(f"Chunks hold more than the {n_rows} rows allocated")
+        for name, array in arrays.items():
+            array[written:end] = chunk[name].to_numpy()
+        written = end
+    
+    for array in arrays.values():
+        array.flush()
+    arrays.clear()
+    
+    if written != n_rows:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise ValueError(f"Chunks held {written} rows, expected {n_rows}")
+    
+    return _finish(tmp_path, path, columns, n_rows, metadata)
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE), 'r') as f:
+        schema = json.load(f)
+    if schema.get('format_version', 0) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version {schema['format_version']}")
+    return schema
+
+def read_columns(path, columns=None, mmap=True, schema=None):
+    schema = schema or read_schema(path)
+    files = {column['name']: column['file'] for column in schema['columns']}
+    
+    names = list(columns) if columns is not None else list(files)
+    missing = [name for name in names if name not in files]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+    
+    mmap_mode = 'r' if mmap else None
+    return {name: np.load(os.path.join(path, files[name]), mmap_mode=mmap_mode, allow_pickle=False) for name in names}
+
+def read_frame(path, columns=None, mmap=True):
+    arrays = read_columns(path, columns, mmap)
+    return pd.DataFrame(arrays, copy=False)
+
+def read_matrix(path, columns, dtype=np.float64, mmap=True):
+    arrays = read_columns(path, columns, mmap)
+    n_rows = len(next(iter(arrays.values()))) if arrays else 0
+    X = np.empty((n_rows, len(arrays)), dtype=dtype)
+    for j, name in enumerate(columns):
+        X[:, j] = arrays[name]
+    return X
+
+def export_csv(path, csv_path, columns=None):
+    read_frame(path, columns).to_csv(csv_path, index=False)
+
+def import_csv(csv_path, path, metadata=None):
+    return write_columns(pd.read_csv(csv_path), path, metadata)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert between CSV and the columnar .npy store")
+    parser.add_argument('source', help="CSV file or columnar store directory")
+    parser.add_argument('destination', help="Columnar store directory or CSV file")
+    parser.add_argument('--columns', nargs='+', help="Only export these columns")
+    args = parser.parse_args(argv)
+    
+    if os.path.isdir(args.source):
+        export_csv(args.source, args.destination, args.columns)
+        print(f"Exported {args.source} to {args.destination}")
+    else:
+        schema = import_csv(args.source, args.destination, {'source': args.source})
+        print(f"Wrote {schema['rows']} rows x {len(schema['columns'])} columns to {args.destination}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,49 +2,209 @@ import pandas as pd
 import numpy as np
 import requests
 import os
+import hashlib
+import json
+import shutil
+from datetime import datetime
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-import pickle
+from columnar_store import read_frame, read_schema, write_columns
 
-def download_heart_disease_data():
-    url = "https://archive.ics.uci.edu/ml/machine-learning-databases/heart-disease/processed.cleveland.data"
+DATA_URL = "https://archive.ics.uci.edu/ml/machine-learning-databases/heart-disease/processed.cleveland.data"
+RAW_DATA_PATH = 'data/heart_disease_raw.csv'
+PROCESSED_DATA_PATH = 'data/heart_disease_processed.csv'
+PROCESSED_COLUMNS_PATH = 'data/heart_disease_processed'
+DATA_CACHE_DIR = 'data/cache'
+MANIFEST_PATH = os.path.join(DATA_CACHE_DIR, 'manifest.json')
+
+# Bump when clean_heart_disease_data changes so cached processed files are rebuilt
+CLEANING_VERSION = 1
+
+COLUMN_NAMES = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+    'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'target'
+]
+
+def _sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+def cached_object_path(sha256):
+    return os.path.join(DATA_CACHE_DIR, 'objects', sha256)
+
+def is_offline():
+    return os.environ.get('HEART_DATA_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+def clean_heart_disease_data(raw_path):
+    df = pd.read_csv(raw_path, names=COLUMN_NAMES)
+    
+    df = df.replace('?', np.nan)
+    
+    numeric_columns = COLUMN_NAMES[:-1]
+    df[numeric_columns] = df[numeric_columns].astype(float)
+    
+    df = df.fillna(df.median())
+    
+    df['target'] = (df['target'] > 0).astype(int)
+    
+    return df
+
+def _fetch(url, entry, timeout):
+    headers = {}
+    if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    elif entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, response.headers
+    response.raise_for_status()
+    return response.content, response.headers
+
+def _store_raw(url, content, entry, manifest):
+    sha256 = _sha256_bytes(content)
+    object_path = cached_object_path(sha256)
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    if not os.path.exists(object_path):
+        _write_atomic(object_path, content)
     
-    column_names = [
-        'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 
-        'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'target'
-    ]
+    previous = manifest.get(url, {})
+    if previous.get('sha256') == sha256:
+        entry = dict(previous, **{k: v for k, v in entry.items() if v is not None})
+    entry.update({'url': url, 'sha256': sha256, 'size': len(content)})
+    manifest[url] = entry
+    return entry
+
+def _adopt_local_raw(url, manifest):
+    if not os.path.exists(RAW_DATA_PATH):
+        return None
+    with open(RAW_DATA_PATH, 'rb') as f:
+        content = f.read()
+    entry = {'source': 'local', 'path': RAW_DATA_PATH}
+    return _store_raw(url, content, entry, manifest)
+
+def _processed_is_current(entry):
+    return (
+        entry.get('processed_sha256') is not None
+        and entry.get('cleaning_version') == CLEANING_VERSION
+        and os.path.exists(PROCESSED_DATA_PATH)
+        and _sha256_file(PROCESSED_DATA_PATH) == entry['processed_sha256']
+    )
+
+def _columns_are_current(entry):
+    try:
+        metadata = read_schema(PROCESSED_COLUMNS_PATH)['metadata']
+    except (OSError, ValueError, KeyError):
+        return False
+    return metadata.get('source_sha256') == entry['sha256'] and metadata.get('cleaning_version') == CLEANING_VERSION
+
+def _write_processed_columns(df, entry):
+    write_columns(df, PROCESSED_COLUMNS_PATH, {'source_sha256': entry['sha256'], 'cleaning_version': CLEANING_VERSION})
+
+def load_processed_data(columns=None, mmap=True):
+    if os.path.exists(os.path.join(PROCESSED_COLUMNS_PATH, 'schema.json')):
+        return read_frame(PROCESSED_COLUMNS_PATH, columns, mmap)
+    return pd.read_csv(PROCESSED_DATA_PATH, usecols=columns)
+
+def download_heart_disease_data(url=DATA_URL, offline=None, refresh=False, timeout=30):
+    offline = is_offline() if offline is None else offline
+    manifest = load_manifest()
+    entry = manifest.get(url)
+    cached = entry is not None and os.path.exists(cached_object_path(entry['sha256']))
     
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        with open('data/heart_disease_raw.csv', 'w') as f:
-            f.write(response.text)
+        if offline:
+            if not cached:
+                entry = _adopt_local_raw(url, manifest)
+                if entry is None:
+                    print(f"Offline mode: no cached copy of {url}")
+                    return None
+            print(f"Offline mode: using cached dataset {entry['sha256'][:12]}")
+        else:
+            try:
+                content, headers = _fetch(url, entry if cached and not refresh else {}, timeout)
+            except requests.RequestException as e:
+                if not cached:
+                    entry = _adopt_local_raw(url, manifest)
+                if entry is None:
+                    raise
+                print(f"Download failed ({e}); falling back to cached dataset {entry['sha256'][:12]}")
+            else:
+                if content is None:
+                    print(f"Dataset not modified upstream ({entry['sha256'][:12]})")
+                    entry['checked_at'] = datetime.now().isoformat(timespec='seconds')
+                else:
+                    entry = _store_raw(url, content, {
+                        'source': 'download',
+                        'etag': headers.get('ETag'),
+                        'last_modified': headers.get('Last-Modified'),
+                        'fetched_at': datetime.now().isoformat(timespec='seconds')
+                    }, manifest)
+                    entry['checked_at'] = entry['fetched_at']
         
-        df = pd.read_csv('data/heart_disease_raw.csv', names=column_names)
+        raw_path = cached_object_path(entry['sha256'])
         
-        df = df.replace('?', np.nan)
+        if not refresh and _columns_are_current(entry):
+            df = read_frame(PROCESSED_COLUMNS_PATH)
+            print(f"Using cached columnar dataset (source sha256 {entry['sha256'][:12]})")
+        elif not refresh and _processed_is_current(entry):
+            df = pd.read_csv(PROCESSED_DATA_PATH)
+            _write_processed_columns(df, entry)
+            print(f"Using cached processed dataset (source sha256 {entry['sha256'][:12]})")
+        else:
+            if not os.path.exists(RAW_DATA_PATH) or _sha256_file(RAW_DATA_PATH) != entry['sha256']:
+                shutil.copyfile(raw_path, RAW_DATA_PATH)
+            
+            df = clean_heart_disease_data(raw_path)
+            df.to_csv(PROCESSED_DATA_PATH, index=False)
+            _write_processed_columns(df, entry)
+            
+            entry.update({
+                'processed_sha256': _sha256_file(PROCESSED_DATA_PATH),
+                'processed_at': datetime.now().isoformat(timespec='seconds'),
+                'cleaning_version': CLEANING_VERSION,
+                'rows': int(len(df))
+            })
+            print(f"Dataset processed successfully!")
         
-        numeric_columns = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 
-                          'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
-        df[numeric_columns] = df[numeric_columns].astype(float)
+        save_manifest(manifest)
         
-        df = df.fillna(df.median())
-        
-        df['target'] = (df['target'] > 0).astype(int)
-        
-        df.to_csv('data/heart_disease_processed.csv', index=False)
-        
-        print(f"Dataset downloaded and processed successfully!")
         print(f"Shape: {df.shape}")
         print(f"Target distribution: {df['target'].value_counts()}")
         
         return df
-        
+    
     except Exception as e:
         print(f"Error downloading data: {e}")
         return None
 
+def dataset_provenance(url=DATA_URL):
+    return load_manifest().get(url)
+
 def prepare_data_for_training(df):
     X = df.drop('target', axis=1)
     y = df['target']
@@ -57,16 +217,19 @@ def prepare_data_for_training(df):
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
-    with open('models/scaler.pkl', 'wb') as f:
-        pickle.dump(scaler, f)
-    
     return X_train_scaled, X_test_scaled, y_train, y_test, scaler
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Download and prepare the heart disease dataset")
+    parser.add_argument('--offline', action='store_true', help="Use only the local dataset cache")
+    parser.add_argument('--refresh', action='store_true', help="Ignore cached validators and rebuild the processed file")
+    args = parser.parse_args()
+    
     os.makedirs('data', exist_ok=True)
-    os.makedirs('models', exist_ok=True)
     
-    df = download_heart_disease_data()
+    df = download_heart_disease_data(offline=args.offline or None, refresh=args.refresh)
     if df is not None:
         X_train, X_test, y_train, y_test, scaler = prepare_data_for_training(df)
         print("Data preparation completed successfully!")
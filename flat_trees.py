@@ -0,0 +1,263 @@
+import json
+import pickle
+import sys
+import time
+import numpy as np
+
+MEAN_PROBABILITY = 'mean_probability'
+LOGIT_SUM = 'logit_sum'
+
+class FlatTreeEnsemble:
+    
+    def __init__(self, feature, threshold, children, value, default_left, roots,
+                 kind, classes, n_features, base_margin=0.0, strict=False, max_depth=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = _comparison_thresholds(threshold, strict)
+        self.children = np.ascontiguousarray(children, dtype=np.intp).reshape(-1, 2)
+        value = np.asarray(value)
+        self.value = np.ascontiguousarray(value, dtype=value.dtype if value.dtype.kind == 'f' else np.float64)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = n_features
+        self.base_margin = float(base_margin)
+        self.strict = strict
+        self.max_depth = max_depth if max_depth is not None else _max_depth(self.left, self.right, self.roots)
+    
+    @property
+    def left(self):
+        return self.children[:, 0]
+    
+    @property
+    def right(self):
+        return self.children[:, 1]
+    
+    @property
+    def n_trees(self):
+        return len(self.roots)
+    
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+    
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children,
+                                      self.value, self.default_left, self.roots))
+    
+    def _leaf_nodes(self, X):
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        children = self.children.ravel()
+        
+        nodes = np.tile(self.roots, n_rows)
+        offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        positions = np.arange(n_rows * self.n_trees)
+        leaves = np.empty(n_rows * self.n_trees, dtype=np.intp)
+        has_missing = bool(np.isnan(X).any())
+        
+        while len(nodes):
+            feature = self.feature[nodes]
+            done = feature < 0
+            if done.any():
+                leaves[positions[done]] = nodes[done]
+                active = ~done
+                nodes, offsets, positions, feature = nodes[active], offsets[active], positions[active], feature[active]
+                if not len(nodes):
+                    break
+            
+            x = flat_X[offsets + feature]
+            if self.strict:
+                go_right = ~(x < self.threshold[nodes])
+            else:
+                go_right = x > self.threshold[nodes]
+            if has_missing:
+                missing = np.isnan(x)
+                go_right[missing] = ~self.default_left[nodes[missing]]
+            nodes = children[2 * nodes + go_right]
+        
+        return leaves.reshape(n_rows, self.n_trees)
+    
+    def leaf_values(self, X):
+        return self.value[self._leaf_nodes(np.ascontiguousarray(X, dtype=np.float32))]
+    
+    def predict_proba(self, X, chunk_size=1024):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        positive = np.empty(X.shape[0], dtype=np.float64)
+        
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self.leaf_values(X[start:start + chunk_size])
+            if self.kind == LOGIT_SUM:
+                margin = leaves.sum(axis=1) + self.base_margin
+                positive[start:start + chunk_size] = 1.0 / (1.0 + np.exp(-margin))
+            else:
+                positive[start:start + chunk_size] = leaves.sum(axis=1) / self.n_trees
+        
+        return np.column_stack([1.0 - positive, positive])
+    
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+def _comparison_thresholds(threshold, strict):
+    threshold = np.asarray(threshold)
+    if threshold.dtype == np.float32:
+        return np.ascontiguousarray(threshold)
+    if strict:
+        return threshold.astype(np.float32)
+    return _round_down_float32(threshold.astype(np.float64))
+
+def _round_down_float32(values):
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+def _max_depth(left, right, roots):
+    depth = 0
+    frontier = np.asarray(roots)
+    while True:
+        internal = frontier[left[frontier] != frontier]
+        if len(internal) == 0:
+            return depth
+        frontier = np.concatenate([left[internal], right[internal]])
+        depth += 1
+
+def stack_trees(trees):
+    feature, threshold, children, value, default_left, roots = [], [], [], [], [], []
+    offset = 0
+    
+    for tree in trees:
+        n = len(tree['feature'])
+        is_leaf = tree['left'] == -1
+        local = np.arange(n)
+        
+        roots.append(offset)
+        feature.append(np.where(is_leaf, -1, tree['feature']))
+        threshold.append(np.where(is_leaf, 0.0, tree['threshold']))
+        children.append(np.column_stack([
+            np.where(is_leaf, local, tree['left']) + offset,
+            np.where(is_leaf, local, tree['right']) + offset
+        ]))
+        value.append(np.where(is_leaf, tree['value'], 0.0))
+        default_left.append(tree['default_left'])
+        offset += n
+    
+    return {
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'children': np.concatenate(children),
+        'value': np.concatenate(value),
+        'default_left': np.concatenate(default_left),
+        'roots': np.array(roots)
+    }
+
+def sklearn_tree_arrays(estimator):
+    tree = estimator.tree_
+    counts = tree.value[:, 0, :]
+    totals = counts.sum(axis=1)
+    positive = np.divide(counts[:, 1], totals, out=np.zeros_like(totals), where=totals > 0)
+    
+    if 'missing_go_to_left' in tree.__getstate__()['nodes'].dtype.names:
+        default_left = tree.__getstate__()['nodes']['missing_go_to_left'].astype(bool)
+    else:
+        default_left = np.zeros(tree.node_count, dtype=bool)
+    
+    return {
+        'feature': tree.feature,
+        'threshold': tree.threshold,
+        'left': tree.children_left,
+        'right': tree.children_right,
+        'value': positive,
+        'default_left': default_left,
+        'impurity': tree.impurity,
+        'weight': tree.weighted_n_node_samples
+    }
+
+def export_sklearn_forest(model):
+    trees = [sklearn_tree_arrays(estimator) for estimator in model.estimators_]
+    
+    return FlatTreeEnsemble(
+        kind=MEAN_PROBABILITY,
+        classes=model.classes_,
+        n_features=model.n_features_in_,
+        strict=False,
+        **stack_trees(trees)
+    )
+
+def export_xgboost(model):
+    booster = model.get_booster()
+    config = json.loads(booster.save_raw('json'))['learner']
+    
+    objective = config['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Unsupported XGBoost objective: {objective}")
+    
+    base_score = float(config['learner_model_param']['base_score'])
+    base_margin = float(np.log(base_score / (1.0 - base_score)))
+    
+    trees = []
+    for tree in config['gradient_booster']['model']['trees']:
+        left = np.array(tree['left_children'])
+        trees.append({
+            'feature': np.array(tree['split_indices']),
+            'threshold': np.array(tree['split_conditions'], dtype=np.float32),
+            'left': left,
+            'right': np.array(tree['right_children']),
+            'value': np.array(tree['split_conditions'], dtype=np.float32),
+            'default_left': np.array(tree['default_left'], dtype=bool)
+        })
+    
+    return FlatTreeEnsemble(
+        kind=LOGIT_SUM,
+        classes=model.classes_,
+        n_features=int(config['learner_model_param']['num_feature']),
+        base_margin=base_margin,
+        strict=True,
+        **stack_trees(trees)
+    )
+
+def export_model(model):
+    if hasattr(model, 'get_booster'):
+        return export_xgboost(model)
+    if hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_):
+        return export_sklearn_forest(model)
+    raise ValueError(f"Cannot flatten model of type {type(model).__name__}")
+
+def verify_export(model, flat_model, X, atol=1e-6):
+    expected = model.predict_proba(X)[:, 1]
+    actual = flat_model.predict_proba(X)[:, 1]
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+    return max_diff <= atol, max_diff
+
+def _throughput(predict, X, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict(X)
+    return repeats * len(X) / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    from data_preparation import load_processed_data
+    from model_loading import load_pickled_model
+    from inference import build_feature_matrix, scale_features
+    
+    model, scaler, feature_names = load_pickled_model()
+    if model is None:
+        sys.exit(1)
+    
+    flat_model = export_model(model)
+    
+    df = load_processed_data(feature_names)
+    X = scale_features(build_feature_matrix(df, feature_names), scaler)
+    X_batch = np.tile(X, (max(1, 100000 // len(X)), 1))
+    
+    ok, max_diff = verify_export(model, flat_model, X)
+    print(f"{'✅' if ok else '❌'} predict_proba max abs difference: {max_diff:.2e}")
+    
+    pickled_size = len(pickle.dumps(model))
+    print(f"Trees: {flat_model.n_trees}, nodes: {flat_model.n_nodes}, depth: {flat_model.max_depth}")
+    print(f"Size: pickled {pickled_size / 1024:.1f} KB -> flat {flat_model.nbytes / 1024:.1f} KB")
+    for batch in (X[:1], X[:64], X_batch):
+        print(f"Batch of {len(batch)}: original {_throughput(model.predict_proba, batch):,.0f} rows/sec, "
+              f"flat {_throughput(flat_model.predict_proba, batch):,.0f} rows/sec")
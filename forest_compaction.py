@@ -0,0 +1,214 @@
+import argparse
+import os
+import sys
+import numpy as np
+from flat_trees import MEAN_PROBABILITY, FlatTreeEnsemble, export_model, sklearn_tree_arrays, stack_trees
+
+def collapse_tree(tree, max_depth=None, min_gain=0.0):
+    left, right = tree['left'], tree['right']
+    n = len(left)
+    internal = left != -1
+    weight, impurity = tree['weight'], tree['impurity']
+    
+    gain = np.zeros(n)
+    nodes = np.flatnonzero(internal)
+    gain[nodes] = (
+        weight[nodes] * impurity[nodes]
+        - weight[left[nodes]] * impurity[left[nodes]]
+        - weight[right[nodes]] * impurity[right[nodes]]
+    ) / weight[0]
+    
+    subtree_gain = gain.copy()
+    for node in nodes[::-1]:
+        subtree_gain[node] += subtree_gain[left[node]] + subtree_gain[right[node]]
+    
+    keep_feature, keep_threshold, keep_left, keep_right, keep_value, keep_default = [], [], [], [], [], []
+    stack = [(0, 0, -1, 0)]
+    while stack:
+        node, depth, parent, side = stack.pop()
+        new_id = len(keep_feature)
+        if parent >= 0:
+            (keep_left if side == 0 else keep_right)[parent] = new_id
+        
+        leaf = (
+            not internal[node]
+            or (max_depth is not None and depth >= max_depth)
+            or subtree_gain[node] < min_gain
+        )
+        keep_feature.append(-2 if leaf else tree['feature'][node])
+        keep_threshold.append(-2.0 if leaf else tree['threshold'][node])
+        keep_left.append(-1)
+        keep_right.append(-1)
+        keep_value.append(tree['value'][node])
+        keep_default.append(tree['default_left'][node])
+        
+        if not leaf:
+            stack.append((right[node], depth + 1, new_id, 1))
+            stack.append((left[node], depth + 1, new_id, 0))
+    
+    return {
+        'feature': np.array(keep_feature),
+        'threshold': np.array(keep_threshold, dtype=np.float64),
+        'left': np.array(keep_left),
+        'right': np.array(keep_right),
+        'value': np.array(keep_value, dtype=np.float64),
+        'default_left': np.array(keep_default, dtype=bool)
+    }
+
+def build_ensemble(trees, classes, n_features, value_dtype=np.float32):
+    stacked = stack_trees(trees)
+    stacked['value'] = stacked['value'].astype(value_dtype)
+    return FlatTreeEnsemble(kind=MEAN_PROBABILITY, classes=classes, n_features=n_features, strict=False, **stacked)
+
+def order_trees(tree_probabilities, target):
+    n_rows, n_trees = tree_probabilities.shape
+    remaining = list(range(n_trees))
+    running = np.zeros(n_rows)
+    order = []
+    
+    for k in range(1, n_trees + 1):
+        candidates = (running[:, None] + tree_probabilities[:, remaining]) / k
+        error = ((candidates - target[:, None]) ** 2).mean(axis=0)
+        tree = remaining.pop(int(np.argmin(error)))
+        running += tree_probabilities[:, tree]
+        order.append(tree)
+    
+    return order
+
+def _prefix_probabilities(tree_probabilities, order):
+    return np.cumsum(tree_probabilities[:, order], axis=1) / np.arange(1, len(order) + 1)
+
+def compact_forest(model, X_holdout, y_holdout, X_reference=None, tolerance=0.005, min_agreement=0.99,
+                   max_depth=None, min_gain=0.0, value_dtype=np.float32, drop_trees=True, max_reference_rows=20000):
+    if not (hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_)):
+        raise ValueError(f"Compaction supports scikit-learn forests, not {type(model).__name__}")
+    
+    trees = [collapse_tree(sklearn_tree_arrays(estimator), max_depth, min_gain) for estimator in model.estimators_]
+    ensemble = build_ensemble(trees, model.classes_, model.n_features_in_, value_dtype)
+    if not drop_trees:
+        return ensemble, None
+    
+    X_reference = X_holdout if X_reference is None else X_reference
+    X_reference = np.ascontiguousarray(X_reference, dtype=np.float32)
+    if len(X_reference) > max_reference_rows:
+        rows = np.random.default_rng(42).choice(len(X_reference), max_reference_rows, replace=False)
+        X_reference = X_reference[rows]
+    
+    full = export_model(model)
+    reference_probabilities = ensemble.leaf_values(X_reference).astype(np.float64)
+    reference_full = full.predict_proba(X_reference)[:, 1]
+    order = order_trees(reference_probabilities, reference_full)
+    
+    y_positive = np.asarray(y_holdout) == model.classes_[1]
+    holdout_probabilities = ensemble.leaf_values(X_holdout)
+    full_accuracy = float(((full.predict_proba(X_holdout)[:, 1] > 0.5) == y_positive).mean())
+    accuracies = ((_prefix_probabilities(holdout_probabilities, order) > 0.5) == y_positive[:, None]).mean(axis=0)
+    agreements = (
+        (_prefix_probabilities(reference_probabilities, order) > 0.5) == (reference_full > 0.5)[:, None]
+    ).mean(axis=0)
+    
+    acceptable = (accuracies >= full_accuracy - tolerance - 1e-12) & (agreements >= min_agreement)
+    keep = int(np.argmax(acceptable)) + 1 if acceptable.any() else len(order)
+    
+    selected = [trees[i] for i in order[:keep]]
+    return build_ensemble(selected, model.classes_, model.n_features_in_, value_dtype), {
+        'order': order,
+        'prefix_accuracy': accuracies.tolist(),
+        'prefix_agreement': agreements.tolist(),
+        'full_accuracy': full_accuracy,
+        'kept_trees': keep
+    }
+
+def describe(name, ensemble, X, y, reference=None):
+    from model_selection import measure_latency
+    
+    predictions = ensemble.predict(X)
+    row = {
+        'name': name,
+        'trees': ensemble.n_trees,
+        'nodes': ensemble.n_nodes,
+        'max_depth': ensemble.max_depth,
+        'kilobytes': ensemble.nbytes / 1024,
+        'accuracy': float(np.mean(predictions == np.asarray(y))),
+        'agreement': float(np.mean(predictions == reference)) if reference is not None else 1.0
+    }
+    row.update(measure_latency(ensemble, X))
+    return row, predictions
+
+def print_report(rows):
+    print(f"\n{'Model':<14}{'Trees':>7}{'Nodes':>9}{'Depth':>7}{'KB':>9}{'Accuracy':>10}{'Agree':>8}{'p50 ms':>9}{'rows/s':>12}")
+    for r in rows:
+        print(f"{r['name']:<14}{r['trees']:>7}{r['nodes']:>9}{r['max_depth']:>7}{r['kilobytes']:>9.1f}"
+              f"{r['accuracy']:>10.4f}{r['agreement']:>8.2%}{r['p50_ms']:>9.3f}{r['rows_per_second']:>12,.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prune and compact the trained RandomForest into a smaller serving artifact")
+    parser.add_argument('--tolerance', type=float, default=0.005, help="Held-out accuracy the pruned forest may lose")
+    parser.add_argument('--min-agreement', type=float, default=0.99,
+                        help="Fraction of reference rows where the pruned forest must match the full forest's label")
+    parser.add_argument('--max-depth', type=int, default=None, help="Collapse every subtree below this depth into a leaf")
+    parser.add_argument('--min-gain', type=float, default=0.0, help="Collapse subtrees whose total impurity decrease is below this fraction")
+    parser.add_argument('--keep-all-trees', action='store_true', help="Skip ordered tree dropping")
+    parser.add_argument('--float64', action='store_true', help="Keep leaf values in float64")
+    parser.add_argument('--output', default=None, help="Write the artifact to this path instead of publishing a registry version")
+    parser.add_argument('--dry-run', action='store_true', help="Only print the trade-off report")
+    args = parser.parse_args(argv)
+    
+    from sklearn.model_selection import train_test_split
+    from data_preparation import load_processed_data
+    from model_artifact import save_artifact
+    from model_export import fold_scaler
+    from model_loading import load_pickled_model
+    from model_registry import current_version, publish_version
+    from model_training import save_pickle
+    
+    model, scaler, feature_names = load_pickled_model()
+    if model is None:
+        return 1
+    
+    df = load_processed_data(list(feature_names) + ['target'])
+    _, X_test, _, y_test = train_test_split(
+        df[feature_names], df['target'], test_size=0.2, random_state=42, stratify=df['target']
+    )
+    X_test = X_test.to_numpy(dtype=np.float64)
+    
+    try:
+        folded = fold_scaler(model, scaler)
+        compacted, details = compact_forest(
+            folded, X_test, y_test, df[feature_names].to_numpy(dtype=np.float64),
+            args.tolerance, args.min_agreement, args.max_depth, args.min_gain,
+            np.float64 if args.float64 else np.float32, not args.keep_all_trees
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    original_row, reference = describe('original', export_model(folded), X_test, y_test)
+    compacted_row, _ = describe('compacted', compacted, X_test, y_test, reference)
+    print_report([original_row, compacted_row])
+    if details is not None:
+        print(f"\nKept {details['kept_trees']} of {len(details['order'])} trees "
+              f"(full forest held-out accuracy {details['full_accuracy']:.4f}, tolerance {args.tolerance}, "
+              f"label agreement {details['prefix_agreement'][details['kept_trees'] - 1]:.2%})")
+    
+    if args.dry_run:
+        return 0
+    
+    if args.output:
+        save_artifact(compacted, feature_names, args.output, folded_scaler=scaler, source='models/best_model.pkl (compacted)')
+        print(f"✅ Wrote {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+        return 0
+    
+    def write(path):
+        save_pickle(list(feature_names), os.path.join(path, 'feature_names.pkl'))
+        save_artifact(compacted, feature_names, os.path.join(path, 'model.hdpm'), folded_scaler=scaler,
+                      source='best_model.pkl (compacted)')
+    
+    metadata = {'source': 'forest compaction', 'compacted': True, 'compacted_from': current_version(), 'trees': compacted.n_trees,
+                'accuracy': compacted_row['accuracy'], 'agreement': compacted_row['agreement']}
+    print(f"✅ Published compacted model version {publish_version(write, metadata)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    sys.exit(main())
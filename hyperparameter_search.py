@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import numpy as np
+from scipy.stats import loguniform, randint
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold
+import xgboost as xgb
+from model_selection import measure_latency
+
+SEARCH_SPACES = {
+    'RandomForest': (
+        lambda: RandomForestClassifier(random_state=42, n_jobs=1),
+        {
+            'n_estimators': [50, 100, 200, 400],
+            'max_depth': [None, 4, 6, 8, 12],
+            'min_samples_leaf': [1, 2, 4, 8],
+            'max_features': ['sqrt', 'log2', 0.5]
+        }
+    ),
+    'LogisticRegression': (
+        lambda: LogisticRegression(random_state=42, max_iter=1000),
+        {
+            'C': loguniform(1e-3, 1e2),
+            'class_weight': [None, 'balanced']
+        }
+    ),
+    'XGBoost': (
+        lambda: xgb.XGBClassifier(random_state=42, eval_metric='logloss', n_jobs=1),
+        {
+            'n_estimators': [50, 100, 200, 400],
+            'max_depth': randint(2, 7),
+            'learning_rate': loguniform(0.01, 0.3),
+            'subsample': [0.6, 0.8, 1.0],
+            'colsample_bytree': [0.6, 0.8, 1.0],
+            'min_child_weight': [1, 3, 5]
+        }
+    )
+}
+
+def _final_candidates(search, top_k):
+    results = search.cv_results_
+    iterations = np.asarray(results['iter'])
+    final = np.flatnonzero(iterations == iterations.max())
+    order = final[np.argsort(-np.asarray(results['mean_test_score'])[final], kind='stable')]
+    return [
+        (results['params'][i], float(results['mean_test_score'][i]), float(results['std_test_score'][i]))
+        for i in order[:top_k]
+    ]
+
+def search_family(name, X_train, y_train, n_candidates=27, factor=3, cv=5, n_jobs=-1, random_state=42):
+    build, space = SEARCH_SPACES[name]
+    search = HalvingRandomSearchCV(
+        build(),
+        space,
+        n_candidates=n_candidates,
+        factor=factor,
+        resource='n_samples',
+        min_resources='smallest',
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state),
+        scoring='accuracy',
+        refit=False,
+        n_jobs=n_jobs,
+        random_state=random_state
+    )
+    
+    start = time.perf_counter()
+    search.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    
+    print(f"{name}: {len(search.cv_results_['params'])} fits over {search.n_iterations_} rounds "
+          f"({search.n_resources_[0]} -> {search.n_resources_[-1]} samples) in {seconds:.1f}s")
+    return search
+
+def search_models(X_train, y_train, X_test, y_test, families=None, n_candidates=27, factor=3, cv=5,
+                  top_k=3, n_jobs=-1):
+    families = families or list(SEARCH_SPACES)
+    leaderboard = []
+    models = {}
+    
+    for name in families:
+        print(f"\nSearching {name}...")
+        search = search_family(name, X_train, y_train, n_candidates, factor, cv, n_jobs)
+        
+        for rank, (params, cv_score, cv_std) in enumerate(_final_candidates(search, top_k)):
+            model = clone(search.estimator).set_params(**params)
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+            
+            y_pred = model.predict(X_test)
+            entry = {
+                'family': name,
+                'params': {k: v.item() if isinstance(v, np.generic) else v for k, v in params.items()},
+                'cv_accuracy': cv_score,
+                'cv_std': cv_std,
+                'holdout_accuracy': float(accuracy_score(y_test, y_pred)),
+                'fit_seconds': fit_seconds
+            }
+            entry.update(measure_latency(model, X_test))
+            leaderboard.append(entry)
+            
+            if rank == 0:
+                models[name] = {
+                    'name': name,
+                    'model': model,
+                    'accuracy': entry['holdout_accuracy'],
+                    'report': classification_report(y_test, y_pred),
+                    'seconds': fit_seconds,
+                    'n_jobs': 1
+                }
+    
+    leaderboard.sort(key=lambda entry: (-entry['cv_accuracy'], entry['p50_ms']))
+    print_leaderboard(leaderboard)
+    return [models[name] for name in families if name in models], leaderboard
+
+def print_leaderboard(leaderboard):
+    print(f"\n{'Rank':<5}{'Model':<20}{'CV acc':>10}{'Holdout':>10}{'p50 ms':>10}{'p99 ms':>10}{'rows/s':>12}")
+    for rank, entry in enumerate(leaderboard, 1):
+        print(f"{rank:<5}{entry['family']:<20}{entry['cv_accuracy']:>10.4f}{entry['holdout_accuracy']:>10.4f}"
+              f"{entry['p50_ms']:>10.3f}{entry['p99_ms']:>10.3f}{entry['rows_per_second']:>12,.0f}")
+        print(f"     {entry['params']}")
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    from model_training import train_models
+    
+    os.makedirs('models', exist_ok=True)
+    train_models(search=True)
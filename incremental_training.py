@@ -0,0 +1,219 @@
+import argparse
+import copy
+import json
+import os
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from columnar_store import read_frame, write_columns
+from data_preparation import download_heart_disease_data, load_processed_data
+from model_export import rescale_model
+from model_loading import load_model, load_pickled_model
+from model_training import publish_model, train_models
+
+DELTA_DIR = 'data/delta'
+STATE_PATH = 'models/incremental_state.json'
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'applied_segments': [], 'updates': []}
+
+def save_state(state, path=STATE_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def append_labelled_rows(rows, feature_names, delta_dir=DELTA_DIR):
+    df = pd.DataFrame(rows) if not isinstance(rows, pd.DataFrame) else rows
+    missing = [column for column in list(feature_names) + ['target'] if column not in df.columns]
+    if missing:
+        raise ValueError(f"Labelled rows are missing columns: {missing}")
+    if df.empty:
+        return None
+    
+    df = df[list(feature_names) + ['target']].astype(float)
+    df['target'] = (df['target'] > 0).astype(int)
+    
+    os.makedirs(delta_dir, exist_ok=True)
+    name = f"segment-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    write_columns(df.reset_index(drop=True), os.path.join(delta_dir, name), {'rows': int(len(df))})
+    return name
+
+def list_segments(delta_dir=DELTA_DIR):
+    if not os.path.isdir(delta_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(delta_dir)
+        if name.startswith('segment-') and os.path.exists(os.path.join(delta_dir, name, 'schema.json'))
+    )
+
+def load_segments(segments, delta_dir=DELTA_DIR):
+    frames = [read_frame(os.path.join(delta_dir, name), mmap=False) for name in segments]
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+def load_history(feature_names, segments=(), delta_dir=DELTA_DIR):
+    columns = list(feature_names) + ['target']
+    history = load_processed_data(columns)
+    applied = load_segments(segments, delta_dir)
+    if applied is not None:
+        history = pd.concat([history, applied[columns]], ignore_index=True)
+    return history
+
+def replay_sample(history, n_rows, random_state=42):
+    n_rows = min(n_rows, len(history))
+    if n_rows <= 0:
+        return None
+    return history.sample(n=n_rows, random_state=random_state)
+
+def refits_on_history(model):
+    return hasattr(model, 'coef_') and not hasattr(model, 'partial_fit')
+
+def update_scaler(scaler, X_new):
+    updated = copy.deepcopy(scaler)
+    updated.partial_fit(X_new)
+    return updated
+
+def extend_model(model, X, y, new_trees=10):
+    if hasattr(model, 'get_booster'):
+        import xgboost as xgb
+        params = model.get_params()
+        params['n_estimators'] = new_trees
+        extended = xgb.XGBClassifier(**params)
+        extended.fit(X, y, xgb_model=model.get_booster())
+        return extended
+    
+    if hasattr(model, 'estimators_'):
+        if len(np.unique(y)) != len(model.classes_):
+            raise ValueError("New trees need every class present in the update batch")
+        extended = copy.deepcopy(model)
+        extended.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees)
+        extended.fit(X, y)
+        extended.set_params(warm_start=False)
+        return extended
+    
+    if hasattr(model, 'partial_fit'):
+        extended = copy.deepcopy(model)
+        extended.partial_fit(X, y)
+        return extended
+    
+    if hasattr(model, 'coef_'):
+        if 'warm_start' not in model.get_params():
+            from sklearn.base import clone
+            return clone(model).fit(X, y)
+        extended = copy.deepcopy(model)
+        extended.set_params(warm_start=True)
+        extended.fit(X, y)
+        extended.set_params(warm_start=False)
+        return extended
+    
+    raise ValueError(f"Incremental updates are not supported for {type(model).__name__}")
+
+def incremental_update(new_trees=10, replay_ratio=4, delta_dir=DELTA_DIR, state_path=STATE_PATH):
+    state = load_state(state_path)
+    pending = [name for name in list_segments(delta_dir) if name not in state['applied_segments']]
+    if not pending:
+        print("No new labelled rows to apply")
+        return None
+    
+    model, scaler, feature_names = load_pickled_model()
+    if model is None:
+        print("No trained model found; run a full rebuild first")
+        return None
+    
+    delta = load_segments(pending, delta_dir)
+    history = load_history(feature_names, state['applied_segments'], delta_dir)
+    replay = history if refits_on_history(model) else replay_sample(history, replay_ratio * len(delta))
+    holdout = history.drop(replay.index) if replay is not None else history
+    batch = pd.concat([delta, replay], ignore_index=True) if replay is not None else delta
+    
+    X_delta = delta[feature_names].astype(np.float64)
+    X_batch = batch[feature_names].astype(np.float64)
+    y_batch = batch['target'].to_numpy()
+    
+    new_scaler = update_scaler(scaler, X_delta)
+    rescaled = rescale_model(model, scaler, new_scaler)
+    before = model.predict(scaler.transform(X_batch))
+    agreement = float(np.mean(rescaled.predict(new_scaler.transform(X_batch)) == before))
+    if agreement < 1.0:
+        print(f"❌ Rescaled model agrees with the current model on only {agreement:.2%} of the update batch; "
+              f"not publishing, run a full rebuild instead")
+        return None
+    
+    try:
+        updated = extend_model(rescaled, new_scaler.transform(X_batch), y_batch, new_trees)
+    except ValueError as e:
+        print(f"❌ Incremental update failed: {e}")
+        return None
+    
+    accuracy = float(np.mean(updated.predict(new_scaler.transform(X_batch)) == y_batch))
+    print(f"Applied {len(delta)} new rows from {len(pending)} segment(s) with {len(batch) - len(delta)} replayed rows")
+    print(f"Rescaled model agreement: {agreement:.2%}, accuracy on update batch: {accuracy:.4f}")
+    
+    X_holdout = holdout[feature_names].to_numpy(dtype=np.float64)
+    if publish_model(updated, new_scaler, feature_names, X_batch.to_numpy(), X_holdout=X_holdout) is None:
+        return None
+    
+    state['applied_segments'].extend(pending)
+    state['updates'].append({
+        'at': datetime.now().isoformat(timespec='seconds'),
+        'segments': pending,
+        'rows': int(len(delta)),
+        'replayed_rows': int(len(batch) - len(delta)),
+        'rows_seen_by_scaler': int(np.max(new_scaler.n_samples_seen_)),
+        'batch_accuracy': accuracy
+    })
+    save_state(state, state_path)
+    return updated
+
+def full_rebuild(offline=None, delta_dir=DELTA_DIR, state_path=STATE_PATH, **train_kwargs):
+    df = download_heart_disease_data(offline=offline)
+    if df is None:
+        print("Failed to load data")
+        return None
+    
+    segments = list_segments(delta_dir)
+    delta = load_segments(segments, delta_dir)
+    if delta is not None:
+        df = pd.concat([df, delta[df.columns]], ignore_index=True)
+        print(f"Full rebuild over {len(df)} rows including {len(delta)} from {len(segments)} delta segment(s)")
+    
+    result = train_models(df=df, **train_kwargs)
+    if result is not None:
+        state = load_state(state_path)
+        state['applied_segments'] = segments
+        state['updates'].append({'at': datetime.now().isoformat(timespec='seconds'), 'full_rebuild': True, 'rows': int(len(df))})
+        save_state(state, state_path)
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally refresh the model from newly labelled assessments")
+    parser.add_argument('--append', metavar='CSV', help="Append labelled rows from a CSV file to the delta store")
+    parser.add_argument('--full-rebuild', action='store_true', help="Retrain from scratch over the dataset plus all delta rows")
+    parser.add_argument('--new-trees', type=int, default=10, help="Trees or boosting rounds added per update")
+    parser.add_argument('--replay-ratio', type=int, default=4, help="Historical rows replayed per new row")
+    parser.add_argument('--offline', action='store_true', help="Use only the local dataset cache for full rebuilds")
+    args = parser.parse_args(argv)
+    
+    os.makedirs('models', exist_ok=True)
+    
+    if args.append:
+        _, _, feature_names = load_model()
+        if feature_names is None:
+            print("No trained model found; run a full rebuild first")
+            return 1
+        segment = append_labelled_rows(pd.read_csv(args.append), feature_names)
+        print(f"Appended {args.append} to the delta store as {segment}")
+    
+    if args.full_rebuild:
+        return 0 if full_rebuild(offline=args.offline or None) is not None else 1
+    
+    incremental_update(args.new_trees, args.replay_ratio)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
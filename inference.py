@@ -0,0 +1,388 @@
+import math
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from flat_trees import LOGIT_SUM, FlatTreeEnsemble, export_model
+from prediction_cache import PredictionCache
+
+def build_feature_matrix(frame, feature_names):
+    X = np.zeros((len(frame), len(feature_names)), dtype=np.float64)
+    
+    for i, feature in enumerate(feature_names):
+        if feature in frame.columns:
+            X[:, i] = pd.to_numeric(frame[feature], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    
+    return X
+
+def scale_features(X, scaler):
+    if scaler is None:
+        return X
+    
+    if hasattr(scaler, 'mean_') and hasattr(scaler, 'scale_'):
+        return (X - scaler.mean_) / scaler.scale_
+    
+    return scaler.transform(X)
+
+def predict_batch(X, model, scaler):
+    X_scaled = scale_features(np.asarray(X, dtype=np.float64), scaler)
+    
+    probabilities = model.predict_proba(X_scaled)
+    predictions = np.asarray(model.classes_)[probabilities.argmax(axis=1)]
+    
+    return predictions, probabilities[:, 1]
+
+MAX_COMPILED_DEPTH = 64
+MAX_COMPILED_NODES = int(os.environ.get('HEART_MAX_COMPILED_NODES', '50000'))
+
+def _sigmoid(z):
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    return math.exp(z) / (1.0 + math.exp(z))
+
+def _emit_node(ensemble, lines, depth, node, op):
+    indent = '    ' * depth
+    feature = int(ensemble.feature[node])
+    
+    if feature < 0:
+        lines.append(f"{indent}total += {float(ensemble.value[node])!r}")
+        return
+    
+    left, right = ensemble.children[node]
+    lines.append(f"{indent}if x{feature} {op} {float(ensemble.threshold[node])!r}:")
+    _emit_node(ensemble, lines, depth + 1, left, op)
+    lines.append(f"{indent}else:")
+    _emit_node(ensemble, lines, depth + 1, right, op)
+
+def compile_tree_ensemble(ensemble):
+    op = '<' if ensemble.strict else '<='
+    used = np.unique(ensemble.feature[ensemble.feature >= 0])
+    lines = ["def _score(x):", "    total = 0.0"]
+    lines.extend(f"    x{feature} = float(x[{feature}])" for feature in used)
+    for root in ensemble.roots:
+        _emit_node(ensemble, lines, 1, root, op)
+    
+    if ensemble.kind == LOGIT_SUM:
+        lines.append(f"    return _sigmoid(total + {ensemble.base_margin!r})")
+    else:
+        lines.append(f"    return total / {ensemble.n_trees}")
+    
+    namespace = {'_sigmoid': _sigmoid}
+    exec(compile("\n".join(lines), "<compiled_tree_ensemble>", "exec"), namespace)
+    return namespace['_score']
+
+def _binary_tree_ensemble(model):
+    if len(getattr(model, 'classes_', [])) != 2:
+        return None
+    
+    if isinstance(model, FlatTreeEnsemble):
+        return model
+    
+    try:
+        return export_model(model)
+    except ValueError:
+        return None
+
+def _compilable(ensemble):
+    return ensemble.n_nodes <= MAX_COMPILED_NODES and ensemble.max_depth < MAX_COMPILED_DEPTH
+
+def _is_binary_linear(model):
+    coef = getattr(model, 'coef_', None)
+    return coef is not None and coef.shape[0] == 1 and hasattr(model, 'intercept_') and hasattr(model, 'predict_proba')
+
+class PredictionEngine:
+    
+    def __init__(self, model, scaler, feature_names):
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = list(feature_names)
+        self.feature_index = {feature: i for i, feature in enumerate(self.feature_names)}
+        self.classes = list(model.classes_)
+        
+        n_features = len(self.feature_names)
+        self._buffer = np.zeros(n_features, dtype=np.float64)
+        self._scaled = np.zeros(n_features, dtype=np.float64)
+        self._batch_view = self._scaled.reshape(1, -1)
+        self._scaled32 = np.zeros(n_features, dtype=np.float32)
+        self._batch_view32 = self._scaled32.reshape(1, -1)
+        self._lock = threading.Lock()
+        
+        if scaler is not None and hasattr(scaler, 'mean_') and hasattr(scaler, 'scale_'):
+            self._mean = np.asarray(scaler.mean_, dtype=np.float64)
+            self._scale = np.asarray(scaler.scale_, dtype=np.float64)
+        else:
+            self._mean = None
+            self._scale = None
+        
+        ensemble = _binary_tree_ensemble(model)
+        if ensemble is not None and _compilable(ensemble):
+            self.mode = 'compiled_trees'
+            self._score = compile_tree_ensemble(ensemble)
+        elif ensemble is not None:
+            self.mode = 'flat_trees'
+            self._ensemble = ensemble
+        elif _is_binary_linear(model):
+            self.mode = 'linear'
+            self._coef = [float(c) for c in model.coef_[0]]
+            self._intercept = float(model.intercept_[0])
+        else:
+            self.mode = 'generic'
+    
+    def _fill(self, user_data):
+        buffer = self._buffer
+        buffer.fill(0.0)
+        for feature, value in user_data.items():
+            i = self.feature_index.get(feature)
+            if i is not None:
+                buffer[i] = value
+    
+    def _transform(self):
+        if self._mean is not None:
+            np.subtract(self._buffer, self._mean, out=self._scaled)
+            np.divide(self._scaled, self._scale, out=self._scaled)
+        elif self.scaler is not None:
+            self._scaled[:] = self.scaler.transform(self._buffer.reshape(1, -1))[0]
+        else:
+            self._scaled[:] = self._buffer
+    
+    def _probability(self):
+        if self.mode == 'compiled_trees':
+            self._scaled32[:] = self._scaled
+            return self._score(self._scaled32)
+        
+        if self.mode == 'flat_trees':
+            self._scaled32[:] = self._scaled
+            return float(self._ensemble.predict_proba(self._batch_view32)[0, 1])
+        
+        if self.mode == 'linear':
+            z = self._intercept
+            for c, v in zip(self._coef, self._scaled.tolist()):
+                z += c * v
+            return 1.0 / (1.0 + math.exp(-z)) if z >= 0 else math.exp(z) / (1.0 + math.exp(z))
+        
+        return float(self.model.predict_proba(self._batch_view)[0, 1])
+    
+    def _predict_buffer(self):
+        self._transform()
+        probability = self._probability()
+        prediction = self.classes[1] if probability > 1.0 - probability else self.classes[0]
+        return prediction, probability
+    
+    def predict_vector(self, vector):
+        with self._lock:
+            self._buffer[:] = vector
+            return self._predict_buffer()
+    
+    def predict(self, user_data):
+        with self._lock:
+            self._fill(user_data)
+            return self._predict_buffer()
+
+class ModelHolder:
+    
+    def __init__(self, loader=None, warmup_rounds=3):
+        self.loader = loader
+        self.warmup_rounds = warmup_rounds
+        self.model = None
+        self.scaler = None
+        self.feature_names = None
+        self.engine = None
+        self.cache = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.memory_bytes = None
+        self.loaded = False
+        self.version = None
+        self.failed_version = None
+        self._reloading = False
+        self._reload_lock = threading.Lock()
+    
+    def load(self):
+        loader = self.loader
+        if loader is None:
+            from model_loading import load_model
+            from model_registry import current_version
+            self.version = current_version()
+            loader = load_model
+        
+        tracemalloc_started = not tracemalloc.is_tracing()
+        if tracemalloc_started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        
+        start = time.perf_counter()
+        model, scaler, feature_names = loader()
+        self.load_seconds = time.perf_counter() - start
+        
+        if model is not None:
+            self.engine = PredictionEngine(model, scaler, feature_names)
+            self.cache = PredictionCache(feature_names, on_change=self.reload_in_background)
+        
+        after, _ = tracemalloc.get_traced_memory()
+        if tracemalloc_started:
+            tracemalloc.stop()
+        
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = feature_names
+        self.memory_bytes = max(after - before, 0)
+        self.loaded = model is not None
+        
+        if self.loaded:
+            self.warmup()
+        
+        return self
+    
+    def reload_artifacts(self):
+        loader = self.loader
+        version = self.version
+        if loader is None:
+            from model_loading import load_model
+            from model_registry import current_version
+            version = current_version()
+            if version is not None and version in (self.version, self.failed_version):
+                return False
+            loader = load_model
+        
+        model, scaler, feature_names = loader()
+        if model is None:
+            print("❌ Model artifacts changed but could not be reloaded; keeping the loaded model")
+            self.failed_version = version
+            return False
+        
+        engine = PredictionEngine(model, scaler, feature_names)
+        same_features = list(feature_names) == list(self.feature_names)
+        cache = self.cache if same_features else PredictionCache(feature_names, on_change=self.reload_in_background)
+        self.model, self.scaler, self.feature_names, self.engine, self.cache = model, scaler, feature_names, engine, cache
+        if same_features:
+            cache.clear()
+        self.version = version
+        self.failed_version = None
+        print(f"✅ Reloaded model artifacts{f' (version {version})' if version else ''}")
+        return True
+    
+    def reload_in_background(self):
+        with self._reload_lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+        
+        threading.Thread(target=self._reload_worker, daemon=True).start()
+        return True
+    
+    def _reload_worker(self):
+        try:
+            self.reload_artifacts()
+        except Exception as e:
+            print(f"❌ Failed to reload model artifacts: {e!r}")
+        finally:
+            with self._reload_lock:
+                self._reloading = False
+    
+    def predict_vector(self, vector):
+        return self.engine.predict_vector(vector)
+    
+    def warmup(self):
+        n_features = len(self.feature_names)
+        if self.scaler is not None and hasattr(self.scaler, 'mean_'):
+            center = np.asarray(self.scaler.mean_, dtype=np.float64)
+        else:
+            center = np.zeros(n_features)
+        
+        start = time.perf_counter()
+        for _ in range(self.warmup_rounds):
+            self.engine.predict_vector(center)
+        predict_batch(np.tile(center, (16, 1)), self.model, self.scaler)
+        self.warmup_seconds = time.perf_counter() - start
+    
+    def artifacts(self):
+        return self.model, self.scaler, self.feature_names
+    
+    def stats(self):
+        return {
+            'loaded': self.loaded,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'memory_bytes': self.memory_bytes,
+            'version': self.version,
+            'cache': self.cache.stats() if self.cache is not None else None
+        }
+
+RELOAD_CHECK_SECONDS = float(os.environ.get('HEART_MODEL_RELOAD_SECONDS', '2'))
+
+_model_holder = None
+_model_holder_lock = threading.Lock()
+_last_reload_check = 0.0
+
+def reload_if_changed():
+    from model_registry import current_version
+    
+    holder = _model_holder
+    if holder is None or holder.loader is not None:
+        return holder
+    
+    if current_version() not in (holder.version, holder.failed_version):
+        holder.reload_in_background()
+    return holder
+
+def get_model_holder():
+    global _model_holder, _last_reload_check
+    
+    if _model_holder is None or not _model_holder.loaded:
+        with _model_holder_lock:
+            if _model_holder is None or not _model_holder.loaded:
+                _model_holder = ModelHolder().load()
+                _last_reload_check = time.monotonic()
+    elif RELOAD_CHECK_SECONDS >= 0 and time.monotonic() - _last_reload_check >= RELOAD_CHECK_SECONDS:
+        _last_reload_check = time.monotonic()
+        return reload_if_changed()
+    
+    return _model_holder
+
+MAX_CACHED_ENGINES = 4
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+def engine_for(model, scaler, feature_names):
+    key = (id(model), id(scaler), tuple(feature_names))
+    with _engines_lock:
+        entry = _engines.get(key)
+        if entry is not None:
+            _engines.move_to_end(key)
+            return entry[2]
+    
+    engine = PredictionEngine(model, scaler, feature_names)
+    with _engines_lock:
+        _engines[key] = (model, scaler, engine)
+        while len(_engines) > MAX_CACHED_ENGINES:
+            _engines.popitem(last=False)
+    return engine
+
+def get_prediction_engine(model, scaler, feature_names):
+    holder = get_model_holder()
+    if holder.model is model and holder.scaler is scaler:
+        return holder.engine
+    return engine_for(model, scaler, feature_names)
+
+def predict_cached(user_data, model, scaler, feature_names):
+    holder = get_model_holder()
+    if holder.model is model and holder.scaler is scaler:
+        return holder.cache.get_or_compute(user_data, holder.predict_vector)
+    return engine_for(model, scaler, feature_names).predict(user_data)
+
+def records_to_matrix(records, feature_names):
+    feature_index = {feature: i for i, feature in enumerate(feature_names)}
+    X = np.zeros((len(records), len(feature_names)), dtype=np.float64)
+    
+    for row, record in enumerate(records):
+        for feature, value in record.items():
+            i = feature_index.get(feature)
+            if i is not None and value is not None:
+                X[row, i] = float(value)
+    
+    return X
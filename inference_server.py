@@ -0,0 +1,289 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import numpy as np
+from model_loading import load_model
+from model_registry import current_version, load_version
+from inference import predict_batch, records_to_matrix
+
+class MicroBatcher:
+    
+    def __init__(self, model, scaler, max_batch_rows=256, max_wait_ms=5.0):
+        self.artifacts = (model, scaler)
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self.batches = 0
+        self.rows = 0
+        self._task = None
+    
+    def swap(self, model, scaler):
+        self.artifacts = (model, scaler)
+    
+    def start(self):
+        if self._task is None:
+            self.queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def submit(self, X):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((X, future))
+        return await future
+    
+    async def _collect(self):
+        pending = [await self.queue.get()]
+        n_rows = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        
+        while n_rows < self.max_batch_rows:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            pending.append(item)
+            n_rows += len(item[0])
+        
+        return pending
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            pending = await self._collect()
+            X = np.vstack([item[0] for item in pending])
+            model, scaler = self.artifacts
+            
+            try:
+                predictions, probabilities = await loop.run_in_executor(
+                    None, predict_batch, X, model, scaler
+                )
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            
+            self.batches += 1
+            self.rows += len(X)
+            
+            start = 0
+            for item_X, future in pending:
+                end = start + len(item_X)
+                if not future.done():
+                    future.set_result((predictions[start:end], probabilities[start:end]))
+                start = end
+    
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_rows': self.rows / self.batches if self.batches else 0.0,
+            'queued': self.queue.qsize() if self.queue is not None else 0
+        }
+
+def serving_model(model):
+    try:
+        from flat_trees import export_model
+        return export_model(model)
+    except (ImportError, ValueError):
+        return model
+
+class InferenceServer:
+    
+    def __init__(self, model, scaler, feature_names, max_batch_rows=256, max_wait_ms=5.0, version=None, reload_seconds=2.0):
+        self.feature_names = list(feature_names)
+        self.batcher = MicroBatcher(serving_model(model), scaler, max_batch_rows, max_wait_ms)
+        self.started = time.time()
+        self.version = version
+        self.failed_version = None
+        self.reload_seconds = reload_seconds
+    
+    def load_serving(self, version):
+        model, scaler, feature_names = load_version(version)
+        return serving_model(model), scaler, feature_names
+    
+    def install(self, version, model, scaler, feature_names):
+        if list(feature_names) != self.feature_names:
+            print(f"❌ Not reloading {version}: its features differ from the ones being served")
+            self.failed_version = version
+            return False
+        
+        self.batcher.swap(model, scaler)
+        print(f"✅ Reloaded model version {version} (was {self.version})")
+        self.version = version
+        self.failed_version = None
+        return True
+    
+    def reload(self, version):
+        return self.install(version, *self.load_serving(version))
+    
+    async def watch_registry(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_seconds)
+            version = None
+            try:
+                version = await loop.run_in_executor(None, current_version)
+                if version is None or version in (self.version, self.failed_version):
+                    continue
+                self.install(version, *await loop.run_in_executor(None, self.load_serving, version))
+            except Exception as e:
+                print(f"❌ Failed to reload model version {version}, still serving {self.version}: {e!r}")
+                self.failed_version = version
+    
+    async def predict(self, payload):
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object of patient features")
+        
+        predictions, probabilities = await self.batcher.submit(records_to_matrix([payload], self.feature_names))
+        return {'prediction': int(predictions[0]), 'probability': float(probabilities[0])}
+    
+    async def predict_batch(self, payload):
+        records = payload.get('records') if isinstance(payload, dict) else payload
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise ValueError("Expected a JSON list of patient records or {\"records\": [...]}")
+        if not records:
+            return {'predictions': []}
+        
+        predictions, probabilities = await self.batcher.submit(records_to_matrix(records, self.feature_names))
+        return {
+            'predictions': [
+                {'prediction': int(p), 'probability': float(q)}
+                for p, q in zip(predictions, probabilities)
+            ]
+        }
+    
+    def health(self):
+        return {
+            'status': 'ok',
+            'uptime_seconds': time.time() - self.started,
+            'model_version': self.version,
+            'failed_version': self.failed_version,
+            'batching': self.batcher.stats()
+        }
+    
+    async def dispatch(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, self.health()
+        
+        if method == 'POST' and path in ('/predict', '/predict_batch'):
+            try:
+                payload = json.loads(body or b'null')
+                if path == '/predict':
+                    return 200, await self.predict(payload)
+                return 200, await self.predict_batch(payload)
+            except (ValueError, TypeError) as e:
+                return 400, {'error': str(e)}
+            except Exception as e:
+                print(f"❌ Error handling {method} {path}: {e!r}")
+                return 500, {'error': f"Internal server error: {type(e).__name__}"}
+        
+        return 404, {'error': f"No route for {method} {path}"}
+    
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                
+                parts = request_line.decode('latin-1').split()
+                if len(parts) < 2:
+                    break
+                method, path = parts[0].upper(), parts[1].split('?', 1)[0]
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                length = headers.get('content-length', '0') or '0'
+                if not length.isdecimal():
+                    self._write_response(writer, 400, {'error': f"Invalid Content-Length: {length!r}"}, False)
+                    await writer.drain()
+                    break
+                length = int(length)
+                body = await reader.readexactly(length) if length else b''
+                
+                status, response = await self.dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, response, keep_alive)
+                await writer.drain()
+                
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+    
+    def _write_response(self, writer, status, response, keep_alive):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 500: 'Internal Server Error'}
+        data = json.dumps(response).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {reasons.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + data)
+    
+    async def serve(self, host='127.0.0.1', port=8000):
+        self.batcher.start()
+        watcher = asyncio.get_running_loop().create_task(self.watch_registry()) if self.reload_seconds > 0 else None
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Inference service listening on http://{host}:{port} "
+              f"(max batch {self.batcher.max_batch_rows} rows / {self.batcher.max_wait * 1000:.1f} ms, "
+              f"model version {self.version or 'unversioned'})")
+        
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                if watcher is not None:
+                    watcher.cancel()
+                await self.batcher.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching JSON inference service for heart disease risk")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-rows', type=int, default=256, help="Flush a batch once this many rows are queued")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help="Longest time a request waits for batch-mates")
+    parser.add_argument('--reload-seconds', type=float, default=2.0,
+                        help="How often to check the registry for a new current version (0 disables hot reload)")
+    args = parser.parse_args(argv)
+    
+    version = current_version()
+    model, scaler, feature_names = load_model()
+    if model is None:
+        print("Failed to load model")
+        return 1
+    
+    server = InferenceServer(model, scaler, feature_names, args.max_batch_rows, args.max_wait_ms,
+                             version, args.reload_seconds)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
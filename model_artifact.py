@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from flat_trees import FlatTreeEnsemble, export_model
+
+ARTIFACT_PATH = 'models/model.hdpm'
+MAGIC = b'HDPMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREFIX = struct.Struct('<8sIIQ')
+
+TREE_ARRAYS = ('feature', 'threshold', 'children', 'value', 'default_left', 'roots')
+
+class LinearModel:
+    
+    def __init__(self, coef, intercept, classes):
+        self.coef_ = np.asarray(coef, dtype=np.float64).reshape(1, -1)
+        self.intercept_ = np.asarray(intercept, dtype=np.float64).reshape(1)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = self.coef_.shape[1]
+    
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_[0] + self.intercept_[0]
+    
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - positive, positive])
+    
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+class ArrayScaler:
+    
+    def __init__(self, mean, scale):
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+    
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _model_arrays(model):
+    if isinstance(model, LinearModel) or (hasattr(model, 'coef_') and not hasattr(model, 'estimators_')):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.shape[0] != 1:
+            raise ValueError("Only binary linear models can be stored")
+        params = {'model_type': 'linear', 'classes': np.asarray(model.classes_).tolist()}
+        return params, {'coef': coef[0], 'intercept': np.asarray(model.intercept_, dtype=np.float64)}
+    
+    ensemble = model if isinstance(model, FlatTreeEnsemble) else export_model(model)
+    params = {
+        'model_type': 'tree_ensemble',
+        'kind': ensemble.kind,
+        'classes': ensemble.classes_.tolist(),
+        'n_features': int(ensemble.n_features_in_),
+        'base_margin': ensemble.base_margin,
+        'strict': bool(ensemble.strict),
+        'max_depth': int(ensemble.max_depth)
+    }
+    return params, {name: getattr(ensemble, name) for name in TREE_ARRAYS}
+
+def _content_hash(header, arrays):
+    digest = hashlib.sha256()
+    digest.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+    for name in sorted(arrays):
+        digest.update(name.encode('utf-8'))
+        digest.update(np.ascontiguousarray(arrays[name]).tobytes())
+    return digest.hexdigest()
+
+def save_artifact(model, feature_names, path=ARTIFACT_PATH, scaler=None, folded_scaler=None, source=None):
+    params, arrays = _model_arrays(model)
+    
+    if scaler is not None:
+        arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+        arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+        scaling = 'separate'
+    elif folded_scaler is not None:
+        arrays['scaler_mean'] = np.asarray(folded_scaler.mean_, dtype=np.float64)
+        arrays['scaler_scale'] = np.asarray(folded_scaler.scale_, dtype=np.float64)
+        scaling = 'folded'
+    else:
+        scaling = 'none'
+    
+    header = {
+        'format_version': FORMAT_VERSION,
+        'params': params,
+        'feature_names': list(feature_names),
+        'scaling': scaling,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': source
+    }
+    header['content_hash'] = _content_hash(header, arrays)
+    
+    layout = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+    
+    header_size = 0
+    while True:
+        offset = _align(PREFIX.size + header_size)
+        for name in arrays:
+            layout[name]['offset'] = offset
+            offset = _align(offset + arrays[name].nbytes)
+        header['arrays'] = layout
+        header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+        if len(header_bytes) <= header_size:
+            break
+        header_size = len(header_bytes) + 256
+    
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, 0, header_size))
+        f.write(header_bytes.ljust(header_size, b' '))
+        for name, array in arrays.items():
+            f.seek(layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(offset)
+    os.replace(tmp_path, path)
+    
+    return header
+
+def read_header(path=ARTIFACT_PATH):
+    with open(path, 'rb') as f:
+        magic, version, _, header_size = PREFIX.unpack(f.read(PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a model artifact")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format version {version}")
+        return json.loads(f.read(header_size).decode('utf-8'))
+
+def _map_arrays(path, header, mmap):
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        if mmap:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=spec['offset'], shape=shape)
+        else:
+            count = int(np.prod(shape))
+            with open(path, 'rb') as f:
+                f.seek(spec['offset'])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return arrays
+
+def load_artifact(path=ARTIFACT_PATH, mmap=True, verify=True):
+    header = read_header(path)
+    arrays = _map_arrays(path, header, mmap)
+    
+    if verify:
+        expected = header['content_hash']
+        check = {k: v for k, v in header.items() if k not in ('content_hash', 'arrays')}
+        if _content_hash(check, arrays) != expected:
+            raise ValueError(f"Content hash mismatch for {path}")
+    
+    params = header['params']
+    if params['model_type'] == 'linear':
+        model = LinearModel(arrays['coef'], arrays['intercept'], params['classes'])
+    else:
+        model = FlatTreeEnsemble(
+            kind=params['kind'],
+            classes=params['classes'],
+            n_features=params['n_features'],
+            base_margin=params['base_margin'],
+            strict=params['strict'],
+            max_depth=params['max_depth'],
+            **{name: arrays[name] for name in TREE_ARRAYS}
+        )
+    
+    scaler = None
+    if header['scaling'] == 'separate':
+        scaler = ArrayScaler(arrays['scaler_mean'], arrays['scaler_scale'])
+    
+    return model, scaler, header['feature_names'], header
+
+def convert_pickles(path=ARTIFACT_PATH, fold=True, X_raw=None):
+    from model_loading import load_pickled_model
+    from model_export import fold_scaler, verify_folded
+    
+    model, scaler, feature_names = load_pickled_model()
+    if model is None:
+        return None
+    
+    if fold:
+        folded = fold_scaler(model, scaler)
+        if X_raw is not None:
+            ok, max_diff, _ = verify_folded(model, scaler, folded, X_raw)
+            if not ok:
+                print(f"❌ Folded model differs from scaler+model pair (max diff {max_diff:.2e})")
+                return None
+        header = save_artifact(folded, feature_names, path, folded_scaler=scaler, source='models/best_model.pkl')
+    else:
+        header = save_artifact(model, feature_names, path, scaler=scaler, source='models/best_model.pkl')
+    
+    print(f"✅ Wrote {path} ({os.path.getsize(path) / 1024:.1f} KB, sha256 {header['content_hash'][:12]})")
+    return header
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    from data_preparation import load_processed_data
+    from model_loading import load_pickled_model
+    
+    df = load_processed_data()
+    X_raw = df.drop('target', axis=1).to_numpy()
+    
+    if convert_pickles(X_raw=X_raw) is None:
+        sys.exit(1)
+    
+    start = time.perf_counter()
+    model, scaler, feature_names = load_pickled_model()
+    pickle_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    artifact_model, _, _, _ = load_artifact()
+    artifact_seconds = time.perf_counter() - start
+    
+    expected = model.predict_proba(scaler.transform(df[feature_names]))[:, 1]
+    actual = artifact_model.predict_proba(X_raw)[:, 1]
+    print(f"Max abs difference vs pickles: {np.max(np.abs(expected - actual)):.2e}")
+    print(f"Load time: pickles {pickle_seconds * 1000:.1f} ms, artifact {artifact_seconds * 1000:.1f} ms")
@@ -0,0 +1,199 @@
+import copy
+import json
+import os
+import pickle
+import sys
+import numpy as np
+
+FOLDED_MODEL_PATH = 'models/folded_model.pkl'
+
+def _scaler_statistics(scaler):
+    mean = np.asarray(scaler.mean_, dtype=np.float64) if getattr(scaler, 'mean_', None) is not None else None
+    scale = np.asarray(scaler.scale_, dtype=np.float64) if getattr(scaler, 'scale_', None) is not None else None
+    n_features = len(mean) if mean is not None else len(scale)
+    
+    if mean is None or not getattr(scaler, 'with_mean', True):
+        mean = np.zeros(n_features)
+    if scale is None or not getattr(scaler, 'with_std', True):
+        scale = np.ones(n_features)
+    
+    return mean, scale
+
+def _shortest_decimal(raw, max_decimals=12):
+    raw = np.asarray(raw, dtype=np.float32)
+    exact = raw.astype(np.float64)
+    entered = exact.copy()
+    pending = np.isfinite(exact)
+    
+    for decimals in range(max_decimals + 1):
+        if not pending.any():
+            break
+        rounded = np.round(exact[pending], decimals)
+        matches = rounded.astype(np.float32) == raw[pending]
+        index = np.flatnonzero(pending)[matches]
+        entered[index] = rounded[matches]
+        pending[index] = False
+    
+    return entered
+
+def _scaled_float32(raw, mean, scale):
+    return ((_shortest_decimal(raw) - mean) / scale).astype(np.float32).astype(np.float64)
+
+def raw_thresholds(thresholds, mean, scale, strict=False, max_steps=64):
+    raw = (thresholds * scale + mean).astype(np.float32)
+    up = np.float32(np.inf)
+    down = np.float32(-np.inf)
+    
+    if strict:
+        inside = lambda r: _scaled_float32(r, mean, scale) >= thresholds
+        outward, inward = down, up
+    else:
+        inside = lambda r: _scaled_float32(r, mean, scale) <= thresholds
+        outward, inward = up, down
+    
+    for _ in range(max_steps):
+        wrong = ~inside(raw)
+        if not wrong.any():
+            break
+        raw[wrong] = np.nextafter(raw[wrong], inward)
+    
+    for _ in range(max_steps):
+        candidate = np.nextafter(raw, outward)
+        extend = inside(candidate)
+        if not extend.any():
+            break
+        raw[extend] = candidate[extend]
+    
+    return raw.astype(np.float64)
+
+def fold_linear(model, mean, scale):
+    folded = copy.deepcopy(model)
+    coef = model.coef_ / scale
+    folded.coef_ = coef
+    folded.intercept_ = model.intercept_ - coef @ mean
+    return folded
+
+def fold_sklearn_forest(model, mean, scale):
+    folded = copy.deepcopy(model)
+    for estimator in folded.estimators_:
+        tree = estimator.tree_
+        internal = tree.children_left != -1
+        features = tree.feature[internal]
+        thresholds = tree.threshold
+        thresholds[internal] = raw_thresholds(thresholds[internal], mean[features], scale[features])
+    return folded
+
+def fold_xgboost(model, mean, scale):
+    raw = json.loads(model.get_booster().save_raw('json'))
+    
+    for tree in raw['learner']['gradient_booster']['model']['trees']:
+        conditions = np.array(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+        internal = np.array(tree['left_children']) != -1
+        features = np.array(tree['split_indices'])[internal]
+        conditions[internal] = raw_thresholds(conditions[internal], mean[features], scale[features], strict=True)
+        tree['split_conditions'] = conditions.astype(np.float32).tolist()
+    
+    folded = copy.deepcopy(model)
+    folded.load_model(bytearray(json.dumps(raw).encode('utf-8')))
+    return folded
+
+def fold_scaler(model, scaler):
+    mean, scale = _scaler_statistics(scaler)
+    
+    if hasattr(model, 'get_booster'):
+        return fold_xgboost(model, mean, scale)
+    if hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_):
+        return fold_sklearn_forest(model, mean, scale)
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        return fold_linear(model, mean, scale)
+    
+    raise ValueError(f"Cannot fold scaler into model of type {type(model).__name__}")
+
+def unfold_scaler(model, scaler):
+    mean, scale = _scaler_statistics(scaler)
+    
+    if hasattr(model, 'get_booster'):
+        raw = json.loads(model.get_booster().save_raw('json'))
+        for tree in raw['learner']['gradient_booster']['model']['trees']:
+            conditions = np.array(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+            internal = np.array(tree['left_children']) != -1
+            features = np.array(tree['split_indices'])[internal]
+            conditions[internal] = (conditions[internal] - mean[features]) / scale[features]
+            tree['split_conditions'] = conditions.astype(np.float32).tolist()
+        unfolded = copy.deepcopy(model)
+        unfolded.load_model(bytearray(json.dumps(raw).encode('utf-8')))
+        return unfolded
+    
+    if hasattr(model, 'estimators_') and all(hasattr(e, 'tree_') for e in model.estimators_):
+        unfolded = copy.deepcopy(model)
+        for estimator in unfolded.estimators_:
+            tree = estimator.tree_
+            internal = tree.children_left != -1
+            features = tree.feature[internal]
+            thresholds = tree.threshold
+            thresholds[internal] = (thresholds[internal] - mean[features]) / scale[features]
+        return unfolded
+    
+    if hasattr(model, 'coef_') and hasattr(model, 'intercept_'):
+        unfolded = copy.deepcopy(model)
+        unfolded.coef_ = model.coef_ * scale
+        unfolded.intercept_ = model.intercept_ + model.coef_ @ mean
+        return unfolded
+    
+    raise ValueError(f"Cannot unfold scaler from model of type {type(model).__name__}")
+
+def rescale_model(model, old_scaler, new_scaler):
+    return unfold_scaler(fold_scaler(model, old_scaler), new_scaler)
+
+def verify_folded(model, scaler, folded, X_raw, atol=1e-6):
+    X_raw = np.asarray(X_raw, dtype=np.float64)
+    mean, scale = _scaler_statistics(scaler)
+    
+    expected = model.predict_proba((X_raw - mean) / scale)[:, 1]
+    actual = folded.predict_proba(X_raw)[:, 1]
+    
+    max_diff = float(np.max(np.abs(expected - actual))) if len(X_raw) else 0.0
+    agreement = float(np.mean((expected > 0.5) == (actual > 0.5))) if len(X_raw) else 1.0
+    return max_diff <= atol, max_diff, agreement
+
+def export_folded_model(model, scaler, feature_names, X_raw=None, output_path=FOLDED_MODEL_PATH, atol=1e-6,
+                        X_holdout=None):
+    folded = fold_scaler(model, scaler)
+    
+    for name, X in (('training', X_raw), ('held-out', X_holdout)):
+        if X is None or not len(X):
+            continue
+        ok, max_diff, agreement = verify_folded(model, scaler, folded, X, atol=atol)
+        print(f"{'✅' if ok else '❌'} Folded model max abs difference on {name} rows: {max_diff:.2e}, "
+              f"label agreement: {agreement:.2%}")
+        if not ok:
+            return None
+    
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'model': folded, 'feature_names': list(feature_names)}, f)
+    os.replace(tmp_path, output_path)
+    
+    return folded
+
+def load_folded_model(path=FOLDED_MODEL_PATH):
+    with open(path, 'rb') as f:
+        artifact = pickle.load(f)
+    return artifact['model'], None, artifact['feature_names']
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    from sklearn.model_selection import train_test_split
+    from data_preparation import load_processed_data
+    from model_loading import load_pickled_model
+    
+    model, scaler, feature_names = load_pickled_model()
+    if model is None:
+        sys.exit(1)
+    
+    df = load_processed_data(list(feature_names) + ['target'])
+    X_train, X_test = train_test_split(df[feature_names].to_numpy(), test_size=0.2, random_state=42, stratify=df['target'])
+    
+    if export_folded_model(model, scaler, feature_names, X_raw=X_train, X_holdout=X_test) is None:
+        sys.exit(1)
+    print(f"Folded model written to {FOLDED_MODEL_PATH}")
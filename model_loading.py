@@ -0,0 +1,54 @@
+import os
+import pickle
+from model_export import FOLDED_MODEL_PATH, load_folded_model
+from model_artifact import ARTIFACT_PATH, load_artifact
+from model_registry import current_version, load_version, load_version_pickles
+
+def load_model():
+    version = current_version()
+    if version is not None:
+        try:
+            return load_version(version)
+        except Exception as e:
+            print(f"Could not load model version {version}, falling back to models/: {e}")
+    
+    if os.path.exists(ARTIFACT_PATH):
+        try:
+            model, scaler, feature_names, _ = load_artifact(ARTIFACT_PATH)
+            return model, scaler, feature_names
+        except Exception as e:
+            print(f"Could not load model artifact, falling back to pickles: {e}")
+    
+    if os.path.exists(FOLDED_MODEL_PATH):
+        try:
+            return load_folded_model(FOLDED_MODEL_PATH)
+        except Exception as e:
+            print(f"Could not load folded model, falling back to pickles: {e}")
+    
+    return load_pickled_model()
+
+def load_pickled_model():
+    version = current_version()
+    if version is not None:
+        try:
+            return load_version_pickles(version)
+        except ValueError as e:
+            print(f"❌ {e}; run a full rebuild or activate an uncompacted version to get a pickled estimator")
+            return None, None, None
+        except (OSError, pickle.UnpicklingError) as e:
+            print(f"Could not load pickles for model version {version}, falling back to models/: {e}")
+    
+    try:
+        with open('models/best_model.pkl', 'rb') as f:
+            model = pickle.load(f)
+        
+        with open('models/scaler.pkl', 'rb') as f:
+            scaler = pickle.load(f)
+        
+        with open('models/feature_names.pkl', 'rb') as f:
+            feature_names = pickle.load(f)
+        
+        return model, scaler, feature_names
+    except FileNotFoundError as e:
+        print(f"Model files not found: {e}")
+        return None, None, None
@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import stat
+import sys
+from datetime import datetime
+
+REGISTRY_DIR = 'models/registry'
+CURRENT_FILE = 'CURRENT'
+HISTORY_FILE = 'history.jsonl'
+MANIFEST_FILE = 'manifest.json'
+
+LEGACY_FILES = ('best_model.pkl', 'scaler.pkl', 'feature_names.pkl', 'folded_model.pkl', 'model.hdpm')
+
+def versions_dir(registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, 'versions')
+
+def version_path(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(versions_dir(registry_dir), version)
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _new_version_id():
+    return datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+
+def publish_version(writer, metadata=None, activate=True, registry_dir=REGISTRY_DIR):
+    version = _new_version_id()
+    os.makedirs(versions_dir(registry_dir), exist_ok=True)
+    staging = os.path.join(versions_dir(registry_dir), f".{version}.tmp")
+    os.makedirs(staging)
+    
+    try:
+        writer(staging)
+        files = {name: _sha256_file(os.path.join(staging, name)) for name in sorted(os.listdir(staging))}
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'files': files,
+            'metadata': metadata or {}
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        for name in os.listdir(staging):
+            os.chmod(os.path.join(staging, name), stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(staging, version_path(version, registry_dir))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    
+    if activate:
+        set_current(version, registry_dir)
+    return version
+
+def current_version(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE), 'r') as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version or None
+
+def set_current(version, registry_dir=REGISTRY_DIR, reason='activate'):
+    if not os.path.isdir(version_path(version, registry_dir)):
+        raise ValueError(f"Unknown model version {version}")
+    
+    previous = current_version(registry_dir)
+    tmp_path = os.path.join(registry_dir, CURRENT_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(registry_dir, CURRENT_FILE))
+    
+    with open(os.path.join(registry_dir, HISTORY_FILE), 'a') as f:
+        f.write(json.dumps({
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'version': version,
+            'previous': previous,
+            'reason': reason
+        }) + '\n')
+    return previous
+
+def read_manifest(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(version_path(version, registry_dir), MANIFEST_FILE), 'r') as f:
+        return json.load(f)
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(versions_dir(registry_dir)):
+        return []
+    return sorted(
+        name for name in os.listdir(versions_dir(registry_dir))
+        if not name.startswith('.') and os.path.exists(os.path.join(versions_dir(registry_dir), name, MANIFEST_FILE))
+    )
+
+def activation_history(registry_dir=REGISTRY_DIR):
+    try:
+        with open(os.path.join(registry_dir, HISTORY_FILE), 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+def rollback(steps=1, registry_dir=REGISTRY_DIR):
+    current = current_version(registry_dir)
+    activated = [entry['version'] for entry in activation_history(registry_dir) if entry.get('reason') != 'rollback']
+    positions = [i for i, version in enumerate(activated) if version == current]
+    
+    seen = []
+    for version in reversed(activated[:positions[-1]] if positions else []):
+        if version != current and version not in seen and os.path.isdir(version_path(version, registry_dir)):
+            seen.append(version)
+            if len(seen) == steps:
+                set_current(version, registry_dir, reason='rollback')
+                return version
+    raise ValueError(f"No version {steps} activation(s) before {current} to roll back to")
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    path = version_path(version, registry_dir)
+    artifact = os.path.join(path, 'model.hdpm')
+    if os.path.exists(artifact):
+        from model_artifact import load_artifact
+        model, scaler, feature_names, _ = load_artifact(artifact)
+        return model, scaler, feature_names
+    return load_version_pickles(version, registry_dir)
+
+def is_compacted(version, registry_dir=REGISTRY_DIR):
+    metadata = read_manifest(version, registry_dir).get('metadata', {})
+    return bool(metadata.get('compacted')) or metadata.get('source') == 'forest compaction'
+
+def load_version_pickles(version, registry_dir=REGISTRY_DIR):
+    if is_compacted(version, registry_dir):
+        raise ValueError(f"Model version {version} is a compacted forest and is only served from model.hdpm")
+    
+    path = version_path(version, registry_dir)
+    loaded = []
+    for name in ('best_model.pkl', 'scaler.pkl', 'feature_names.pkl'):
+        with open(os.path.join(path, name), 'rb') as f:
+            loaded.append(pickle.load(f))
+    return tuple(loaded)
+
+def import_legacy(models_dir='models', registry_dir=REGISTRY_DIR, activate=True):
+    present = [name for name in LEGACY_FILES if os.path.exists(os.path.join(models_dir, name))]
+    if 'best_model.pkl' not in present:
+        raise ValueError(f"No models/best_model.pkl to import from {models_dir}")
+    
+    def copy_files(staging):
+        for name in present:
+            shutil.copy2(os.path.join(models_dir, name), os.path.join(staging, name))
+    
+    return publish_version(copy_files, {'source': 'legacy import', 'files': present}, activate, registry_dir)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage versions in the model registry")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="List versions and mark the current one")
+    commands.add_parser('current', help="Print the current version")
+    activate_parser = commands.add_parser('activate', help="Make a version current")
+    activate_parser.add_argument('version')
+    rollback_parser = commands.add_parser('rollback', help="Reactivate an earlier version")
+    rollback_parser.add_argument('--steps', type=int, default=1)
+    commands.add_parser('import-legacy', help="Register the files in models/ as a new version")
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == 'list':
+            current = current_version()
+            for version in list_versions():
+                metadata = read_manifest(version).get('metadata', {})
+                marker = '*' if version == current else ' '
+                print(f"{marker} {version}  {json.dumps(metadata, sort_keys=True)}")
+        elif args.command == 'current':
+            print(current_version() or "No current version")
+        elif args.command == 'activate':
+            set_current(args.version)
+            print(f"✅ Activated {args.version}")
+        elif args.command == 'rollback':
+            print(f"✅ Rolled back to {rollback(args.steps)}")
+        elif args.command == 'import-legacy':
+            print(f"✅ Imported legacy models as {import_legacy()}")
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from inference import PredictionEngine, predict_batch
+
+DEFAULT_POLICY = 'fastest_within'
+DEFAULT_TOLERANCE = 0.01
+
+def measure_latency(model, X, n_single=200, batch_size=1024):
+    X = np.asarray(X, dtype=np.float64)
+    engine = PredictionEngine(model, None, [str(i) for i in range(X.shape[1])])
+    rows = X[np.arange(n_single) % len(X)]
+    
+    for row in rows[:10]:
+        engine.predict_vector(row)
+    
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        engine.predict_vector(row)
+        timings.append(time.perf_counter() - start)
+    
+    batch = X[np.arange(batch_size) % len(X)]
+    start = time.perf_counter()
+    predict_batch(batch, model, None)
+    batch_seconds = time.perf_counter() - start
+    
+    timings = np.array(timings) * 1000.0
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'rows_per_second': batch_size / batch_seconds if batch_seconds > 0 else float('inf')
+    }
+
+def measure_footprint(model, scaler, feature_names, X_raw, batch_size=1024):
+    from model_artifact import load_artifact, save_artifact
+    from model_export import fold_scaler
+    
+    handle, path = tempfile.mkstemp(suffix='.hdpm')
+    os.close(handle)
+    try:
+        save_artifact(fold_scaler(model, scaler), feature_names, path, folded_scaler=scaler)
+        artifact_bytes = os.path.getsize(path)
+        
+        tracemalloc_started = not tracemalloc.is_tracing()
+        if tracemalloc_started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        
+        served, _, _, _ = load_artifact(path, mmap=False)
+        PredictionEngine(served, None, feature_names)
+        predict_batch(np.asarray(X_raw, dtype=np.float64)[np.arange(batch_size) % len(X_raw)], served, None)
+        
+        _, peak = tracemalloc.get_traced_memory()
+        if tracemalloc_started:
+            tracemalloc.stop()
+    finally:
+        os.remove(path)
+    
+    return {'artifact_bytes': artifact_bytes, 'peak_memory_bytes': max(peak - before, 0)}
+
+def measure_candidate(result, scaler, feature_names, X_test, X_raw):
+    metrics = {'name': result['name'], 'accuracy': float(result['accuracy']), 'fit_seconds': result['seconds']}
+    metrics.update(measure_latency(result['model'], X_test))
+    metrics.update(measure_footprint(result['model'], scaler, feature_names, X_raw))
+    return metrics
+
+def pareto_front(candidates):
+    front = []
+    for c in candidates:
+        dominated = any(
+            o['accuracy'] >= c['accuracy'] and o['p50_ms'] <= c['p50_ms']
+            and (o['accuracy'] > c['accuracy'] or o['p50_ms'] < c['p50_ms'])
+            for o in candidates
+        )
+        if not dominated:
+            front.append(c['name'])
+    return front
+
+def select_most_accurate(candidates, tolerance):
+    return max(candidates, key=lambda c: c['accuracy'])
+
+def select_fastest_within(candidates, tolerance):
+    best_accuracy = max(c['accuracy'] for c in candidates)
+    eligible = [c for c in candidates if c['accuracy'] >= best_accuracy - tolerance - 1e-12]
+    return min(eligible, key=lambda c: (c['p50_ms'], -c['accuracy']))
+
+def select_smallest_within(candidates, tolerance):
+    best_accuracy = max(c['accuracy'] for c in candidates)
+    eligible = [c for c in candidates if c['accuracy'] >= best_accuracy - tolerance - 1e-12]
+    return min(eligible, key=lambda c: (c['artifact_bytes'], -c['accuracy']))
+
+SELECTION_POLICIES = {
+    'accuracy': select_most_accurate,
+    'fastest_within': select_fastest_within,
+    'smallest_within': select_smallest_within
+}
+
+def select_model(candidates, policy=DEFAULT_POLICY, tolerance=DEFAULT_TOLERANCE):
+    if policy not in SELECTION_POLICIES:
+        raise ValueError(f"Unknown selection policy '{policy}', expected one of {sorted(SELECTION_POLICIES)}")
+    return SELECTION_POLICIES[policy](candidates, tolerance)['name']
+
+def print_candidates(candidates, selected):
+    print(f"\n{'Model':<20}{'Accuracy':>10}{'p50 ms':>10}{'p99 ms':>10}{'rows/s':>12}{'Size KB':>10}{'Peak KB':>10}")
+    for c in candidates:
+        marker = ' <' if c['name'] == selected else ''
+        print(f"{c['name']:<20}{c['accuracy']:>10.4f}{c['p50_ms']:>10.3f}{c['p99_ms']:>10.3f}"
+              f"{c['rows_per_second']:>12,.0f}{c['artifact_bytes'] / 1024:>10.1f}{c['peak_memory_bytes'] / 1024:>10.1f}{marker}")
+
+def metrics_report(candidates, selected, policy, tolerance):
+    return {
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+        'policy': policy,
+        'tolerance': tolerance,
+        'selected': selected,
+        'pareto_front': pareto_front(candidates),
+        'candidates': candidates
+    }
@@ -4,74 +4,176 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import xgboost as xgb
+import json
 import pickle
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.model_selection import train_test_split
 from data_preparation import download_heart_disease_data, prepare_data_for_training
+from model_export import export_folded_model
+from model_artifact import save_artifact
+from model_loading import load_model, load_pickled_model
+from model_registry import publish_version
+from model_selection import (DEFAULT_POLICY, DEFAULT_TOLERANCE, SELECTION_POLICIES, measure_candidate,
+                             print_candidates, metrics_report, select_model)
 
-def train_models():
+CANDIDATE_MODELS = ('RandomForest', 'LogisticRegression', 'XGBoost')
+
+MULTI_THREADED_MODELS = {'RandomForest', 'XGBoost'}
+
+def build_model(name, n_jobs=1):
+    if name == 'RandomForest':
+        return RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    if name == 'LogisticRegression':
+        return LogisticRegression(random_state=42, max_iter=1000)
+    if name == 'XGBoost':
+        return xgb.XGBClassifier(random_state=42, eval_metric='logloss', n_jobs=n_jobs)
+    raise ValueError(f"Unknown model: {name}")
+
+def thread_budgets(names, n_cores=None):
+    n_cores = n_cores or os.cpu_count() or 1
+    threaded = [name for name in names if name in MULTI_THREADED_MODELS]
+    spare = max(n_cores - (len(names) - len(threaded)), len(threaded))
     
-    df = download_heart_disease_data()
-    if df is None:
-        print("Failed to load data")
-        return None
+    budgets = {name: 1 for name in names}
+    for i, name in enumerate(threaded):
+        budgets[name] = spare // len(threaded) + (1 if i < spare % len(threaded) else 0)
+    return budgets
+
+def fit_candidate(name, n_jobs, X_train, y_train, X_test, y_test):
+    from threadpoolctl import threadpool_limits
     
-    X_train, X_test, y_train, y_test, scaler = prepare_data_for_training(df)
+    start = time.perf_counter()
+    with threadpool_limits(limits=n_jobs):
+        model = build_model(name, n_jobs)
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
     
-    models = {
-        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
-        'LogisticRegression': LogisticRegression(random_state=42, max_iter=1000),
-        'XGBoost': xgb.XGBClassifier(random_state=42, eval_metric='logloss')
+    return {
+        'name': name,
+        'model': model,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'report': classification_report(y_test, y_pred),
+        'seconds': time.perf_counter() - start,
+        'n_jobs': n_jobs
     }
+
+def fit_candidates(X_train, y_train, X_test, y_test, names=CANDIDATE_MODELS, max_workers=None):
+    budgets = thread_budgets(names)
+    max_workers = max_workers or min(len(names), os.cpu_count() or 1)
+    results = {}
     
-    best_model = None
-    best_score = 0
-    best_model_name = ""
-    
-    for name, model in models.items():
-        print(f"\nTraining {name}...")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fit_candidate, name, budgets[name], X_train, y_train, X_test, y_test): name
+            for name in names
+        }
+        print(f"Training {len(names)} models on {max_workers} worker(s), thread budgets: {budgets}")
         
-        model.fit(X_train, y_train)
-        
-        y_pred = model.predict(X_test)
-        
-        accuracy = accuracy_score(y_test, y_pred)
-        print(f"{name} Accuracy: {accuracy:.4f}")
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"\n❌ {name} failed: {e}")
+                continue
+            
+            results[name] = result
+            print(f"\n{name} Accuracy: {result['accuracy']:.4f} "
+                  f"({result['seconds']:.2f}s, {result['n_jobs']} thread(s))")
+            print(f"\n{name} Classification Report:")
+            print(result['report'])
+    
+    return [results[name] for name in names if name in results]
+
+def save_pickle(obj, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
+
+def publish_model(model, scaler, feature_names, X_raw, metadata=None, reports=None, X_holdout=None):
+    def write(path):
+        save_pickle(model, os.path.join(path, 'best_model.pkl'))
+        save_pickle(scaler, os.path.join(path, 'scaler.pkl'))
+        save_pickle(list(feature_names), os.path.join(path, 'feature_names.pkl'))
         
-        print(f"\n{name} Classification Report:")
-        print(classification_report(y_test, y_pred))
+        folded = export_folded_model(model, scaler, feature_names, X_raw=X_raw,
+                                     output_path=os.path.join(path, 'folded_model.pkl'), X_holdout=X_holdout)
+        if folded is None:
+            raise ValueError("Folded model does not reproduce the scaler and model pair")
+        save_artifact(folded, feature_names, os.path.join(path, 'model.hdpm'), folded_scaler=scaler, source='best_model.pkl')
         
-        if accuracy > best_score:
-            best_score = accuracy
-            best_model = model
-            best_model_name = name
-            
-            with open('models/best_model.pkl', 'wb') as f:
-                pickle.dump(model, f)
+        for name, report in (reports or {}).items():
+            with open(os.path.join(path, name), 'w') as f:
+                json.dump(report, f, indent=2)
     
-    print(f"\nBest model: {best_model_name} with accuracy: {best_score:.4f}")
+    try:
+        version = publish_version(write, metadata)
+    except ValueError as e:
+        print(f"❌ Model not published: {e}")
+        return None
+    
+    print(f"✅ Published model version {version}")
+    return version
+
+def train_models(max_workers=None, offline=None, search=False, n_candidates=27, df=None,
+                 policy=DEFAULT_POLICY, tolerance=DEFAULT_TOLERANCE):
+    
+    if df is None:
+        df = download_heart_disease_data(offline=offline)
+    if df is None:
+        print("Failed to load data")
+        return None
+    
+    X_train, X_test, y_train, y_test, scaler = prepare_data_for_training(df)
+    
+    if search:
+        from hyperparameter_search import search_models
+        results, leaderboard = search_models(X_train, y_train, X_test, y_test, n_candidates=n_candidates)
+    else:
+        leaderboard = None
+        results = fit_candidates(X_train, y_train, X_test, y_test, max_workers=max_workers)
+    if not results:
+        print("No model trained successfully")
+        return None
     
     feature_names = df.drop('target', axis=1).columns.tolist()
-    with open('models/feature_names.pkl', 'wb') as f:
-        pickle.dump(feature_names, f)
+    X_raw = df[feature_names].to_numpy()
+    
+    candidates = [measure_candidate(result, scaler, feature_names, X_test, X_raw) for result in results]
+    selected = select_model(candidates, policy, tolerance)
+    print_candidates(candidates, selected)
+    reports = {'model_metrics.json': metrics_report(candidates, selected, policy, tolerance)}
+    if leaderboard is not None:
+        reports['search_leaderboard.json'] = leaderboard
+    
+    best = next(result for result in results if result['name'] == selected)
+    best_model, best_model_name, best_score = best['model'], best['name'], best['accuracy']
+    
+    print(f"\nBest model: {best_model_name} with accuracy: {best_score:.4f} (policy: {policy}, tolerance: {tolerance})")
+    
+    X_raw_train, X_raw_test = train_test_split(X_raw, test_size=0.2, random_state=42, stratify=df['target'])
+    metadata = {'model': best_model_name, 'accuracy': best_score, 'policy': policy, 'rows': int(len(df))}
+    publish_model(best_model, scaler, feature_names, X_raw_train, metadata, reports, X_holdout=X_raw_test)
     
     return best_model, best_model_name, best_score
 
-def load_model():
-    try:
-        with open('models/best_model.pkl', 'rb') as f:
-            model = pickle.load(f)
-        
-        with open('models/scaler.pkl', 'rb') as f:
-            scaler = pickle.load(f)
-            
-        with open('models/feature_names.pkl', 'rb') as f:
-            feature_names = pickle.load(f)
-            
-        return model, scaler, feature_names
-    except FileNotFoundError as e:
-        print(f"Model files not found: {e}")
-        return None, None, None
-
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Train heart disease prediction models")
+    parser.add_argument('--search', action='store_true', help="Tune hyperparameters with successive halving before picking the best model")
+    parser.add_argument('--n-candidates', type=int, default=27, help="Configurations sampled per model family in search mode")
+    parser.add_argument('--workers', type=int, default=None, help="Process pool size for parallel training")
+    parser.add_argument('--offline', action='store_true', help="Train from the local dataset cache only")
+    parser.add_argument('--policy', choices=sorted(SELECTION_POLICIES), default=DEFAULT_POLICY,
+                        help="How to pick the served model from the trained candidates")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Accuracy a faster or smaller model may give up versus the most accurate one")
+    args = parser.parse_args()
+    
     os.makedirs('models', exist_ok=True)
-    train_models()
+    train_models(max_workers=args.workers, offline=args.offline or None, search=args.search, n_candidates=args.n_candidates,
+                 policy=args.policy, tolerance=args.tolerance)
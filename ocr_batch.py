@@ -0,0 +1,289 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+MIN_PARAMETERS = 5
+FINAL_STATUSES = ('ok', 'insufficient', 'no_text', 'no_parameters')
+
+FEATURE_COLUMNS = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal']
+OUTPUT_COLUMNS = ['file', 'status', 'message', 'prediction', 'probability', 'parameters_found', 'confidence',
+                  'ocr_passes', 'cached', 'seconds', 'warnings'] + FEATURE_COLUMNS
+
+_processor = None
+
+def _is_jsonl(path):
+    return os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson', '.json')
+
+def _is_image(name):
+    return os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+def is_archive(path):
+    return os.path.isfile(path) and (zipfile.is_zipfile(path) or tarfile.is_tarfile(path))
+
+def list_reports(source):
+    if os.path.isdir(source):
+        found = []
+        for root, _, names in os.walk(source):
+            for name in names:
+                if _is_image(name):
+                    found.append(os.path.relpath(os.path.join(root, name), source))
+        return sorted(found)
+    
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return sorted(info.filename for info in archive.infolist() if not info.is_dir() and _is_image(info.filename))
+    
+    with tarfile.open(source) as archive:
+        return sorted(member.name for member in archive.getmembers() if member.isfile() and _is_image(member.name))
+
+def iter_payloads(source, names):
+    if os.path.isdir(source):
+        for name in names:
+            yield name, os.path.join(source, name)
+        return
+    
+    wanted = set(names)
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in names:
+                yield name, archive.read(name)
+        return
+    
+    with tarfile.open(source) as archive:
+        for member in archive:
+            if member.name in wanted:
+                yield member.name, archive.extractfile(member).read()
+
+def completed_reports(output_path):
+    if not os.path.exists(output_path):
+        return set()
+    
+    with open(output_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+            data = data[:data.rfind(b'\n') + 1]
+    
+    text = data.decode('utf-8')
+    if _is_jsonl(output_path):
+        rows = (json.loads(line) for line in text.splitlines() if line.strip())
+    else:
+        rows = csv.DictReader(io.StringIO(text))
+    return {row['file'] for row in rows if row['status'] in FINAL_STATUSES}
+
+def _init_worker(cache_dir):
+    global _processor
+    try:
+        from utils.ocr_utils import OCRProcessor
+    except ImportError:
+        from ocr_utils import OCRProcessor
+    _processor = OCRProcessor(max_workers=1, cache_dir=cache_dir)
+
+def process_report(name, payload):
+    try:
+        from utils.ocr_utils import to_model_features, validate_parameters
+    except ImportError:
+        from ocr_utils import to_model_features, validate_parameters
+    
+    start = time.perf_counter()
+    result = _processor.process_image_file(io.BytesIO(payload) if isinstance(payload, bytes) else payload)
+    validated, warnings = validate_parameters(result['parameters'])
+    
+    return {
+        'file': name,
+        'status': result.get('status', 'ok' if result['success'] else 'error'),
+        'message': result['message'],
+        'parameters_found': len(validated),
+        'confidence': result.get('confidence'),
+        'ocr_passes': result.get('ocr_passes'),
+        'cached': result.get('cached', False),
+        'seconds': round(time.perf_counter() - start, 3),
+        'warnings': '; '.join(warnings),
+        'features': to_model_features(validated)
+    }
+
+class ResultWriter:
+    
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.jsonl = _is_jsonl(output_path)
+        new_file = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+        self.output = open(output_path, 'a', newline='', encoding='utf-8')
+        self.writer = None if self.jsonl else csv.DictWriter(self.output, fieldnames=OUTPUT_COLUMNS, extrasaction='ignore')
+        if self.writer is not None and new_file:
+            self.writer.writeheader()
+    
+    def write(self, rows):
+        for row in rows:
+            record = {column: row.get(column) for column in OUTPUT_COLUMNS}
+            if self.jsonl:
+                self.output.write(json.dumps(record) + '\n')
+            else:
+                self.writer.writerow(record)
+        self.output.flush()
+    
+    def close(self):
+        self.output.close()
+
+def score_results(results, model, scaler, feature_names, min_parameters=MIN_PARAMETERS):
+    import pandas as pd
+    from inference import build_feature_matrix, predict_batch
+    
+    rows = []
+    scorable = []
+    for result in results:
+        row = dict(result, **result['features'])
+        if row['status'] == 'ok' and row['parameters_found'] < min_parameters:
+            row['status'] = 'insufficient'
+            row['message'] = f"Only {row['parameters_found']} of {min_parameters} required parameters extracted"
+        if row['status'] == 'ok':
+            scorable.append(row)
+        rows.append(row)
+    
+    if scorable:
+        X = build_feature_matrix(pd.DataFrame([row['features'] for row in scorable]), feature_names)
+        predictions, probabilities = predict_batch(X, model, scaler)
+        for row, prediction, probability in zip(scorable, predictions, probabilities):
+            row['prediction'] = int(prediction)
+            row['probability'] = float(probability)
+    
+    return rows
+
+def run_pipeline(source, output_path, workers=None, batch_size=64, min_parameters=MIN_PARAMETERS,
+                 cache_dir=None, progress_every=2.0, verbose=True):
+    from model_loading import load_model
+    
+    model, scaler, feature_names = load_model()
+    if model is None:
+        return None
+    
+    names = list_reports(source)
+    done = completed_reports(output_path)
+    pending_names = [name for name in names if name not in done]
+    if verbose:
+        print(f"Found {len(names):,} report images, {len(names) - len(pending_names):,} already completed")
+    
+    workers = workers or os.cpu_count() or 1
+    if cache_dir is None:
+        try:
+            from utils.ocr_cache import OCR_CACHE_DIR
+        except ImportError:
+            from ocr_cache import OCR_CACHE_DIR
+        cache_dir = OCR_CACHE_DIR
+    
+    counts = {}
+    processed = 0
+    buffered = []
+    start = time.perf_counter()
+    last_report = start
+    writer = ResultWriter(output_path)
+    
+    def flush():
+        rows = score_results(buffered, model, scaler, feature_names, min_parameters)
+        writer.write(rows)
+        for row in rows:
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+        buffered.clear()
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as executor:
+            payloads = iter_payloads(source, pending_names)
+            in_flight = set()
+            in_flight_names = {}
+            exhausted = False
+            
+            while in_flight or not exhausted:
+                while not exhausted and len(in_flight) < workers * 4:
+                    try:
+                        name, payload = next(payloads)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    future = executor.submit(process_report, name, payload)
+                    in_flight.add(future)
+                    in_flight_names[future] = name
+                if not in_flight:
+                    break
+                
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    try:
+                        buffered.append(future.result())
+                    except Exception as e:
+                        buffered.append({'file': in_flight_names[future], 'status': 'error', 'message': str(e),
+                                         'parameters_found': 0, 'features': {}})
+                    in_flight_names.pop(future)
+                    processed += 1
+                if len(buffered) >= batch_size:
+                    flush()
+                
+                now = time.perf_counter()
+                if verbose and now - last_report >= progress_every:
+                    last_report = now
+                    rate = processed / (now - start)
+                    remaining = (len(pending_names) - processed) / rate if rate > 0 else float('inf')
+                    print(f"Processed {processed:,}/{len(pending_names):,} reports "
+                          f"({rate:,.1f} reports/sec, ~{remaining:,.0f}s remaining)")
+    finally:
+        if buffered:
+            flush()
+        writer.close()
+    
+    elapsed = time.perf_counter() - start
+    stats = {
+        'reports': processed,
+        'skipped': len(names) - len(pending_names),
+        'seconds': elapsed,
+        'reports_per_second': processed / elapsed if elapsed > 0 else 0.0,
+        'statuses': counts
+    }
+    
+    if verbose:
+        summary = ', '.join(f"{status}: {count:,}" for status, count in sorted(counts.items()))
+        print(f"Done: {stats['reports']:,} reports in {stats['seconds']:.1f}s "
+              f"({stats['reports_per_second']:,.1f} reports/sec) {summary}")
+    
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR a folder or archive of medical report images and score each one")
+    parser.add_argument('source', help="Directory of report images, or a .zip/.tar(.gz) archive of them")
+    parser.add_argument('output', help="CSV or JSONL file for per-report results; on rerun, reports with a final "
+                                       "status are skipped and errors are retried")
+    parser.add_argument('--workers', type=int, default=None, help="OCR worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=64, help="Reports scored per model call")
+    parser.add_argument('--min-parameters', type=int, default=MIN_PARAMETERS,
+                        help="Reports with fewer extracted parameters are marked insufficient and not scored")
+    parser.add_argument('--no-cache', action='store_true', help="Do not read or write the OCR result cache")
+    parser.add_argument('--quiet', action='store_true', help="Only print the final summary")
+    args = parser.parse_args(argv)
+    
+    if not (os.path.isdir(args.source) or is_archive(args.source)):
+        print(f"❌ {args.source} is not a directory or a zip/tar archive")
+        return 1
+    
+    try:
+        stats = run_pipeline(args.source, args.output, args.workers, args.batch_size, args.min_parameters,
+                             '' if args.no_cache else None, verbose=not args.quiet)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume")
+        return 130
+    
+    if stats is None:
+        print("Failed to load model")
+        return 1
+    
+    if args.quiet:
+        print(f"{stats['reports']} reports, {stats['reports_per_second']:,.1f} reports/sec, {stats['statuses']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
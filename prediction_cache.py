@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MODEL_ARTIFACT_PATHS = (
+    'models/registry/CURRENT',
+    'models/model.hdpm',
+    'models/folded_model.pkl',
+    'models/best_model.pkl',
+    'models/scaler.pkl',
+    'models/feature_names.pkl'
+)
+
+def model_fingerprint(paths=MODEL_ARTIFACT_PATHS):
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append((path, None, None))
+    return tuple(fingerprint)
+
+class PredictionCache:
+    
+    def __init__(self, feature_names, max_bytes=8 * 1024 * 1024, artifact_paths=MODEL_ARTIFACT_PATHS,
+                 check_interval=1.0, on_change=None):
+        self.feature_names = list(feature_names)
+        self.max_bytes = max_bytes
+        self.artifact_paths = artifact_paths
+        self.check_interval = check_interval
+        self.on_change = on_change
+        
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._fingerprint = model_fingerprint(artifact_paths)
+        self._last_check = time.monotonic()
+        
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def canonicalize(self, user_data):
+        return tuple(float(user_data.get(feature, 0) or 0) for feature in self.feature_names)
+    
+    def _entry_size(self, key, value):
+        size = sys.getsizeof(key) + sys.getsizeof(value) + 64
+        size += sum(sys.getsizeof(v) for v in key)
+        size += sum(sys.getsizeof(v) for v in value)
+        return size
+    
+    def _check_model(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return False
+        self._last_check = now
+        
+        fingerprint = model_fingerprint(self.artifact_paths)
+        if fingerprint == self._fingerprint:
+            return False
+        
+        self._fingerprint = fingerprint
+        self._entries.clear()
+        self.current_bytes = 0
+        self.invalidations += 1
+        self._generation += 1
+        return True
+    
+    def _model_changed(self):
+        if self.on_change is not None:
+            self.on_change()
+    
+    def _lookup(self, key):
+        with self._lock:
+            changed = self._check_model()
+            generation = self._generation
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        
+        if changed:
+            self._model_changed()
+        return (entry[0] if entry is not None else None), generation
+    
+    def get(self, key):
+        return self._lookup(key)[0]
+    
+    def put(self, key, value, generation=None):
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+        
+        with self._lock:
+            changed = self._check_model()
+            if not changed and (generation is None or generation == self._generation):
+                self._store(key, value, size)
+        
+        if changed:
+            self._model_changed()
+    
+    def _store(self, key, value, size):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= previous[1]
+        
+        self._entries[key] = (value, size)
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+    
+    def get_or_compute(self, user_data, compute):
+        key = self.canonicalize(user_data)
+        value, generation = self._lookup(key)
+        if value is None:
+            value = compute(list(key))
+            self.put(key, value, generation)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self._generation += 1
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,92 @@
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+from model_loading import load_model, load_pickled_model
+from model_registry import current_version, is_compacted
+from inference import build_feature_matrix, predict_batch
+
+def _is_jsonl(path):
+    return os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson', '.json')
+
+def read_chunks(input_path, chunk_size=50000):
+    if _is_jsonl(input_path):
+        return pd.read_json(input_path, lines=True, chunksize=chunk_size)
+    return pd.read_csv(input_path, chunksize=chunk_size)
+
+def load_scoring_model():
+    version = current_version()
+    if version is not None and is_compacted(version):
+        return load_model()
+    
+    model, scaler, feature_names = load_pickled_model()
+    if model is None:
+        model, scaler, feature_names = load_model()
+    return model, scaler, feature_names
+
+def score_frame(frame, model, scaler, feature_names):
+    X = build_feature_matrix(frame, feature_names)
+    predictions, probabilities = predict_batch(X, model, scaler)
+    
+    scored = frame.copy()
+    scored['prediction'] = predictions
+    scored['probability'] = probabilities
+    return scored
+
+def _write_chunk(scored, output, output_path, first_chunk):
+    if _is_jsonl(output_path):
+        scored.to_json(output, orient='records', lines=True)
+    else:
+        scored.to_csv(output, index=False, header=first_chunk)
+
+def score_file(input_path, output_path, chunk_size=50000, model=None, scaler=None, feature_names=None, verbose=True):
+    if model is None:
+        model, scaler, feature_names = load_scoring_model()
+        if model is None:
+            return None
+    
+    total_rows = 0
+    start = time.perf_counter()
+    
+    with open(output_path, 'w', newline='') as output:
+        for chunk_index, chunk in enumerate(read_chunks(input_path, chunk_size)):
+            scored = score_frame(chunk, model, scaler, feature_names)
+            _write_chunk(scored, output, output_path, chunk_index == 0)
+            
+            total_rows += len(scored)
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"Scored {total_rows} rows ({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    
+    elapsed = time.perf_counter() - start
+    stats = {
+        'rows': total_rows,
+        'seconds': elapsed,
+        'rows_per_second': total_rows / elapsed if elapsed > 0 else 0.0
+    }
+    
+    if verbose:
+        print(f"Done: {stats['rows']} rows in {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/sec)")
+    
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch heart disease risk scoring for CSV or JSONL files")
+    parser.add_argument('input', help="CSV or JSONL file of patient records")
+    parser.add_argument('output', help="Destination CSV or JSONL file for predictions")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows scored per model call")
+    parser.add_argument('--quiet', action='store_true', help="Only print the final summary")
+    args = parser.parse_args(argv)
+    
+    stats = score_file(args.input, args.output, chunk_size=args.chunk_size, verbose=not args.quiet)
+    if stats is None:
+        print("Failed to load model")
+        return 1
+    
+    if args.quiet:
+        print(f"{stats['rows']} rows, {stats['rows_per_second']:,.0f} rows/sec")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
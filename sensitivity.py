@@ -0,0 +1,47 @@
+import numpy as np
+from inference import predict_batch
+
+MODIFIABLE_RANGES = {
+    'trestbps': (90, 200),
+    'chol': (100, 400),
+    'thalach': (60, 200),
+    'oldpeak': (0.0, 6.0),
+    'fbs': (0, 1)
+}
+
+BINARY_PARAMETERS = {'fbs'}
+
+def sweep_values(parameter, steps=50, ranges=MODIFIABLE_RANGES):
+    low, high = ranges[parameter]
+    if parameter in BINARY_PARAMETERS:
+        return np.array([low, high], dtype=np.float64)
+    return np.linspace(low, high, steps)
+
+def sensitivity_sweep(user_data, model, scaler, feature_names, parameters=None, steps=50, ranges=MODIFIABLE_RANGES):
+    feature_index = {feature: i for i, feature in enumerate(feature_names)}
+    parameters = [p for p in (parameters or list(ranges)) if p in feature_index and p in ranges]
+    
+    base = np.array([float(user_data.get(feature, 0)) for feature in feature_names], dtype=np.float64)
+    grids = [sweep_values(p, steps, ranges) for p in parameters]
+    if not grids:
+        return {}
+    
+    X = np.tile(base, (sum(len(g) for g in grids), 1))
+    start = 0
+    for parameter, grid in zip(parameters, grids):
+        X[start:start + len(grid), feature_index[parameter]] = grid
+        start += len(grid)
+    
+    _, probabilities = predict_batch(X, model, scaler)
+    
+    curves = {}
+    start = 0
+    for parameter, grid in zip(parameters, grids):
+        curves[parameter] = {
+            'values': grid,
+            'probabilities': probabilities[start:start + len(grid)],
+            'current': float(user_data.get(parameter, 0))
+        }
+        start += len(grid)
+    
+    return curves
@@ -0,0 +1,228 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from data_preparation import COLUMN_NAMES
+
+TEST_EVERY = 5
+
+class QuantileSketch:
+    
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.k:
+                level = np.sort(level)
+                keep = level[:1] if len(level) % 2 else level[:0]
+                level = level[len(keep):]
+                promoted = level[self._rng.integers(2)::2]
+                self.levels[h] = keep
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+    
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self._compress()
+        return self
+    
+    def quantile(self, q):
+        values = np.concatenate(self.levels)
+        if not len(values):
+            return np.nan
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        return float(values[order][np.searchsorted(cumulative, q * cumulative[-1])])
+    
+    @property
+    def size(self):
+        return sum(len(level) for level in self.levels)
+
+class RunningMoments:
+    
+    def __init__(self, n_features):
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+    
+    def update(self, X):
+        observed = ~np.isnan(X)
+        n = observed.sum(axis=0).astype(np.float64)
+        if not n.any():
+            return
+        safe_n = np.maximum(n, 1)
+        mean = np.where(observed, X, 0.0).sum(axis=0) / safe_n
+        m2 = (np.where(observed, X - mean, 0.0) ** 2).sum(axis=0)
+        
+        total = self.count + n
+        safe_total = np.maximum(total, 1)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * n / safe_total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * n / safe_total
+        self.count = total
+    
+    def imputed(self, fill, n_rows):
+        missing = n_rows - self.count
+        mean = (self.count * self.mean + missing * fill) / n_rows
+        m2 = self.m2 + self.count * (self.mean - mean) ** 2 + missing * (fill - mean) ** 2
+        return mean, m2 / n_rows
+
+def read_source_chunks(path, chunk_size=100000, raw=False):
+    if os.path.isdir(path):
+        from columnar_store import read_columns, read_schema
+        schema = read_schema(path)
+        arrays = read_columns(path, schema=schema)
+        for start in range(0, schema['rows'], chunk_size):
+            yield pd.DataFrame({name: np.asarray(a[start:start + chunk_size]) for name, a in arrays.items()})
+        return
+    
+    if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson', '.json'):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size)
+    elif raw:
+        reader = pd.read_csv(path, names=COLUMN_NAMES, na_values='?', chunksize=chunk_size)
+    else:
+        reader = pd.read_csv(path, na_values='?', chunksize=chunk_size)
+    
+    for chunk in reader:
+        yield chunk
+
+def _split(chunk, feature_names):
+    X = chunk[feature_names].to_numpy(dtype=np.float64)
+    y = (chunk['target'].to_numpy(dtype=np.float64) > 0).astype(np.int64)
+    return X, y
+
+def fit_preprocessing(path, feature_names, chunk_size=100000, raw=False, sketch_size=2048):
+    sketches = [QuantileSketch(sketch_size, seed=j) for j in range(len(feature_names))]
+    moments = RunningMoments(len(feature_names))
+    n_rows = 0
+    positives = 0
+    
+    for chunk in read_source_chunks(path, chunk_size, raw):
+        X, y = _split(chunk, feature_names)
+        for j, sketch in enumerate(sketches):
+            sketch.update(X[:, j])
+        moments.update(X)
+        n_rows += len(X)
+        positives += int(y.sum())
+    
+    if not n_rows:
+        raise ValueError(f"No rows read from {path}")
+    
+    medians = np.array([sketch.quantile(0.5) for sketch in sketches])
+    medians = np.nan_to_num(medians)
+    mean, var = moments.imputed(medians, n_rows)
+    
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+    scaler.n_samples_seen_ = n_rows
+    scaler.n_features_in_ = len(feature_names)
+    
+    return medians, scaler, {'rows': n_rows, 'positives': positives, 'missing': (n_rows - moments.count).astype(int).tolist()}
+
+def _prepare_chunk(chunk, feature_names, medians, scaler, start_row):
+    X, y = _split(chunk, feature_names)
+    missing = np.isnan(X)
+    if missing.any():
+        X = np.where(missing, medians, X)
+    test = (np.arange(start_row, start_row + len(X)) % TEST_EVERY) == 0
+    return (X - scaler.mean_) / scaler.scale_, y, test
+
+def train_streaming(path, feature_names, chunk_size=100000, raw=False, epochs=3, seed=42):
+    medians, scaler, summary = fit_preprocessing(path, feature_names, chunk_size, raw)
+    model = SGDClassifier(loss='log_loss', alpha=1e-4, average=True, random_state=seed)
+    rng = np.random.default_rng(seed)
+    classes = np.array([0, 1])
+    
+    for epoch in range(epochs):
+        start_row = 0
+        for chunk in read_source_chunks(path, chunk_size, raw):
+            X, y, test = _prepare_chunk(chunk, feature_names, medians, scaler, start_row)
+            start_row += len(X)
+            train = np.flatnonzero(~test)
+            rng.shuffle(train)
+            if len(train):
+                model.partial_fit(X[train], y[train], classes=classes)
+    
+    correct = 0
+    evaluated = 0
+    start_row = 0
+    for chunk in read_source_chunks(path, chunk_size, raw):
+        X, y, test = _prepare_chunk(chunk, feature_names, medians, scaler, start_row)
+        start_row += len(X)
+        if test.any():
+            correct += int((model.predict(X[test]) == y[test]).sum())
+            evaluated += int(test.sum())
+    
+    summary['holdout_rows'] = evaluated
+    summary['accuracy'] = correct / evaluated if evaluated else float('nan')
+    summary['medians'] = medians.tolist()
+    return model, scaler, summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train on datasets larger than memory by streaming them in chunks")
+    parser.add_argument('source', help="CSV, JSONL or columnar store directory with feature columns and target")
+    parser.add_argument('--raw', action='store_true', help="Source is in the headerless UCI format with '?' for missing")
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--epochs', type=int, default=3)
+    parser.add_argument('--publish', action='store_true', help="Replace the served model with the streamed model")
+    args = parser.parse_args(argv)
+    
+    feature_names = COLUMN_NAMES[:-1]
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        model, scaler, summary = train_streaming(args.source, feature_names, args.chunk_size, args.raw, args.epochs)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {e}")
+        return 1
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    print(f"Streamed {summary['rows']:,} rows x {args.epochs} epoch(s) in {seconds:.1f}s, "
+          f"peak traced memory {peak / 1024 / 1024:.1f} MB")
+    print(f"Holdout accuracy on {summary['holdout_rows']:,} rows: {summary['accuracy']:.4f}")
+    
+    if args.publish:
+        from model_training import publish_model
+        sample = next(read_source_chunks(args.source, 10000, args.raw))
+        X_sample = sample[feature_names].to_numpy(dtype=np.float64)
+        X_raw = np.where(np.isnan(X_sample), summary['medians'], X_sample)
+        test = (np.arange(len(X_raw)) % TEST_EVERY) == 0
+        if publish_model(model, scaler, feature_names, X_raw[~test], X_holdout=X_raw[test]) is None:
+            return 1
+        print("✅ Published streamed model")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    sys.exit(main())
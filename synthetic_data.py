@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import rankdata
+
+SOURCE_PATH = 'data/heart_disease_processed.csv'
+MAX_CATEGORIES = 10
+LABEL_MODES = ('copula', 'model')
+
+def _decimals(values, max_decimals=3):
+    for decimals in range(max_decimals + 1):
+        if np.allclose(values, np.round(values, decimals)):
+            return decimals
+    return max_decimals
+
+def _correlation_cholesky(normal_scores):
+    correlation = np.corrcoef(normal_scores, rowvar=False)
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+    
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    eigenvalues = np.clip(eigenvalues, 1e-6, None)
+    correlation = eigenvectors @ np.diag(eigenvalues) @ eigenvectors.T
+    scale = np.sqrt(np.diag(correlation))
+    correlation = correlation / np.outer(scale, scale)
+    return correlation, np.linalg.cholesky(correlation)
+
+class SyntheticGenerator:
+    
+    def __init__(self, columns, marginals, correlation, cholesky, dtypes):
+        self.columns = list(columns)
+        self.marginals = marginals
+        self.correlation = correlation
+        self.cholesky = cholesky
+        self.dtypes = dtypes
+    
+    @classmethod
+    def fit(cls, df):
+        df = df.dropna()
+        marginals = []
+        normal_scores = np.empty(df.shape, dtype=np.float64)
+        
+        for j, column in enumerate(df.columns):
+            values = df[column].to_numpy(dtype=np.float64)
+            n = len(values)
+            normal_scores[:, j] = ndtri(rankdata(values) / (n + 1))
+            
+            unique, counts = np.unique(values, return_counts=True)
+            if len(unique) <= MAX_CATEGORIES:
+                marginals.append({'kind': 'categorical', 'values': unique, 'cdf': np.cumsum(counts) / n})
+            else:
+                ordered = np.sort(values)
+                marginals.append({
+                    'kind': 'continuous',
+                    'values': ordered,
+                    'quantiles': (np.arange(1, n + 1) - 0.5) / n,
+                    'decimals': _decimals(values)
+                })
+        
+        correlation, cholesky = _correlation_cholesky(normal_scores)
+        return cls(df.columns, marginals, correlation, cholesky, {c: df[c].dtype for c in df.columns})
+    
+    def _uniforms(self, n_rows, rng):
+        normals = rng.standard_normal((n_rows, len(self.columns))) @ self.cholesky.T
+        return ndtr(normals)
+    
+    def sample(self, n_rows, rng):
+        uniforms = self._uniforms(n_rows, rng)
+        data = {}
+        for j, (column, marginal) in enumerate(zip(self.columns, self.marginals)):
+            u = uniforms[:, j]
+            if marginal['kind'] == 'categorical':
+                index = np.minimum(np.searchsorted(marginal['cdf'], u, side='right'), len(marginal['values']) - 1)
+                values = marginal['values'][index]
+            else:
+                values = np.round(np.interp(u, marginal['quantiles'], marginal['values']), marginal['decimals'])
+            data[column] = values.astype(self.dtypes[column])
+        return pd.DataFrame(data, columns=self.columns)
+    
+    def stream(self, n_rows, chunk_size=500000, seed=0):
+        seeds = np.random.SeedSequence(seed).spawn((n_rows + chunk_size - 1) // chunk_size)
+        for i, chunk_seed in enumerate(seeds):
+            yield self.sample(min(chunk_size, n_rows - i * chunk_size), np.random.default_rng(chunk_seed))
+
+def model_labeller(seed=0):
+    from inference import build_feature_matrix, predict_batch
+    from model_loading import load_model
+    
+    model, scaler, feature_names = load_model()
+    if model is None:
+        raise ValueError("No trained model available to label synthetic rows")
+    rng = np.random.default_rng(np.random.SeedSequence([seed, 1]))
+    
+    def label(frame):
+        _, probabilities = predict_batch(build_feature_matrix(frame, feature_names), model, scaler)
+        labelled = frame.copy()
+        labelled['target'] = (rng.random(len(frame)) < probabilities).astype(np.int64)
+        return labelled
+    return label
+
+def synthetic_chunks(n_rows, chunk_size=500000, seed=0, labels='copula', source_path=SOURCE_PATH):
+    source = pd.read_csv(source_path)
+    if labels == 'copula':
+        generator = SyntheticGenerator.fit(source)
+        return generator.stream(n_rows, chunk_size, seed), generator.dtypes
+    
+    if labels == 'model':
+        generator = SyntheticGenerator.fit(source.drop(columns='target'))
+        label = model_labeller(seed)
+        dtypes = dict(generator.dtypes, target=np.dtype(np.int64))
+        return (label(chunk) for chunk in generator.stream(n_rows, chunk_size, seed)), dtypes
+    
+    raise ValueError(f"Unknown label mode '{labels}', expected one of {LABEL_MODES}")
+
+def _output_format(path, output_format=None):
+    if output_format:
+        return output_format
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    return 'columnar'
+
+def write_synthetic(output_path, n_rows, chunk_size=500000, seed=0, labels='copula', output_format=None,
+                    source_path=SOURCE_PATH, quiet=False):
+    output_format = _output_format(output_path, output_format)
+    chunks, dtypes = synthetic_chunks(n_rows, chunk_size, seed, labels, source_path)
+    start = time.perf_counter()
+    written = 0
+    
+    def progress(chunks):
+        nonlocal written
+        for chunk in chunks:
+            yield chunk
+            written += len(chunk)
+            if not quiet:
+                elapsed = time.perf_counter() - start
+                print(f"Generated {written:,}/{n_rows:,} rows ({written / elapsed:,.0f} rows/s)")
+    
+    if output_format == 'columnar':
+        from columnar_store import write_column_chunks
+        metadata = {'generator': 'gaussian_copula', 'seed': seed, 'labels': labels, 'source': source_path}
+        write_column_chunks(progress(chunks), output_path, dtypes, n_rows, metadata)
+    else:
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'w', newline='') as output:
+            for i, chunk in enumerate(progress(chunks)):
+                if output_format == 'jsonl':
+                    chunk.to_json(output, orient='records', lines=True)
+                else:
+                    chunk.to_csv(output, index=False, header=i == 0)
+        os.replace(tmp_path, output_path)
+    
+    seconds = time.perf_counter() - start
+    return {'rows': written, 'seconds': seconds, 'rows_per_second': written / seconds if seconds > 0 else 0.0}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic heart disease records with a Gaussian copula")
+    parser.add_argument('output', help="Output path: .csv, .jsonl, or a directory for the columnar store")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunk-size', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--labels', choices=LABEL_MODES, default='copula',
+                        help="Sample target jointly with the features, or from the trained model's probabilities")
+    parser.add_argument('--format', choices=('csv', 'jsonl', 'columnar'), default=None)
+    parser.add_argument('--source', default=SOURCE_PATH, help="Dataset the marginals and correlations are fitted on")
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+    
+    try:
+        stats = write_synthetic(args.output, args.rows, args.chunk_size, args.seed, args.labels,
+                                args.format, args.source, args.quiet)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    print(f"✅ Wrote {stats['rows']:,} rows to {args.output} in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.path.append('.')
+    sys.exit(main())
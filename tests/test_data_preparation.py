@@ -0,0 +1,68 @@
+import os
+import shutil
+import pytest
+import data_preparation
+
+RAW = (
+    b"63.0,1.0,1.0,145.0,233.0,1.0,2.0,150.0,0.0,2.3,3.0,0.0,6.0,0\n"
+    b"67.0,1.0,4.0,160.0,286.0,0.0,2.0,108.0,1.0,1.5,2.0,3.0,3.0,2\n"
+    b"37.0,1.0,3.0,130.0,250.0,0.0,0.0,187.0,0.0,3.5,3.0,0.0,3.0,0\n"
+    b"41.0,0.0,2.0,130.0,204.0,0.0,2.0,172.0,0.0,1.4,1.0,?,3.0,0\n"
+)
+
+class FakeResponse:
+    
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+    
+    def raise_for_status(self):
+        pass
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    return tmp_path
+
+def _serve(monkeypatch, response_for):
+    requests_seen = []
+    
+    def get(url, headers=None, timeout=None):
+        requests_seen.append(dict(headers or {}))
+        return response_for(headers or {})
+    
+    monkeypatch.setattr(data_preparation.requests, 'get', get)
+    return requests_seen
+
+def _not_modified_if_conditional(headers):
+    if 'If-None-Match' in headers or 'If-Modified-Since' in headers:
+        return FakeResponse(304)
+    return FakeResponse(200, RAW, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'})
+
+def test_missing_cached_object_downloads_unconditionally(workdir, monkeypatch):
+    seen = _serve(monkeypatch, _not_modified_if_conditional)
+    assert data_preparation.download_heart_disease_data(offline=False) is not None
+    
+    entry = data_preparation.load_manifest()[data_preparation.DATA_URL]
+    os.remove(data_preparation.cached_object_path(entry['sha256']))
+    os.remove(data_preparation.PROCESSED_DATA_PATH)
+    shutil.rmtree(data_preparation.PROCESSED_COLUMNS_PATH)
+    
+    df = data_preparation.download_heart_disease_data(offline=False)
+    assert df is not None and len(df) == 4
+    assert seen[-1] == {}
+    assert os.path.exists(data_preparation.cached_object_path(entry['sha256']))
+
+def test_conditional_request_uses_etag_then_last_modified(workdir, monkeypatch):
+    seen = _serve(monkeypatch, _not_modified_if_conditional)
+    data_preparation.download_heart_disease_data(offline=False)
+    data_preparation.download_heart_disease_data(offline=False)
+    assert seen[-1] == {'If-None-Match': '"v1"'}
+    
+    manifest = data_preparation.load_manifest()
+    manifest[data_preparation.DATA_URL]['etag'] = None
+    data_preparation.save_manifest(manifest)
+    assert data_preparation.download_heart_disease_data(offline=False) is not None
+    assert seen[-1] == {'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
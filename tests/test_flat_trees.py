@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from flat_trees import export_model, verify_export
+
+def _dataset(n_rows=400, n_features=6, missing=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] - X[:, 2] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    if missing:
+        X[rng.random(X.shape) < missing] = np.nan
+    return X, y
+
+def _assert_equivalent(model, X, atol=1e-6):
+    flat = export_model(model)
+    ok, max_diff = verify_export(model, flat, X, atol)
+    assert ok, f"max abs difference {max_diff:.2e}"
+    np.testing.assert_allclose(flat.predict_proba(X), model.predict_proba(X), atol=atol)
+    np.testing.assert_array_equal(flat.predict(X), model.predict(X))
+
+def test_random_forest_export_matches_predict_proba():
+    X, y = _dataset()
+    model = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    X_test, _ = _dataset(seed=1)
+    _assert_equivalent(model, X_test)
+
+def test_random_forest_export_matches_on_thresholds():
+    X, y = _dataset()
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    splits = [(e.tree_.feature[e.tree_.feature >= 0], e.tree_.threshold[e.tree_.feature >= 0]) for e in model.estimators_]
+    features = np.concatenate([feature for feature, _ in splits])
+    thresholds = np.concatenate([threshold for _, threshold in splits])
+    
+    X_edge = X[np.arange(len(thresholds)) % len(X)].copy()
+    X_edge[np.arange(len(thresholds)), features] = thresholds
+    _assert_equivalent(model, X_edge)
+
+def test_random_forest_export_handles_nan():
+    X, y = _dataset(missing=0.1)
+    try:
+        model = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    except ValueError:
+        pytest.skip("this scikit-learn version does not support missing values in forests")
+    X_test, _ = _dataset(missing=0.1, seed=1)
+    _assert_equivalent(model, X_test)
+
+@pytest.mark.parametrize('missing', [0.0, 0.1])
+def test_xgboost_export_matches_predict_proba(missing):
+    xgboost = pytest.importorskip('xgboost')
+    X, y = _dataset(missing=missing)
+    model = xgboost.XGBClassifier(n_estimators=40, max_depth=4, learning_rate=0.3, random_state=0).fit(X, y)
+    X_test, _ = _dataset(missing=missing, seed=1)
+    _assert_equivalent(model, X_test, atol=1e-5)
+
+def test_xgboost_export_handles_nan_rows_trained_without_missing():
+    xgboost = pytest.importorskip('xgboost')
+    X, y = _dataset()
+    model = xgboost.XGBClassifier(n_estimators=20, max_depth=3, random_state=0).fit(X, y)
+    X_test, _ = _dataset(missing=0.3, seed=2)
+    _assert_equivalent(model, X_test, atol=1e-5)
@@ -0,0 +1,35 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from incremental_training import extend_model, refits_on_history
+
+def _dataset(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 4))
+    y = (X[:, 0] - X[:, 1] + rng.normal(scale=0.3, size=n_rows) > 0).astype(int)
+    return X, y
+
+def test_logistic_regression_warm_starts_on_accumulated_rows():
+    X, y = _dataset()
+    model = LogisticRegression().fit(X[:200], y[:200])
+    assert refits_on_history(model)
+    
+    updated = extend_model(model, X, y)
+    expected = LogisticRegression().fit(X, y)
+    np.testing.assert_allclose(updated.coef_, expected.coef_, rtol=1e-3)
+    assert updated.n_iter_[0] < expected.n_iter_[0]
+    assert not updated.warm_start
+    np.testing.assert_allclose(model.coef_, LogisticRegression().fit(X[:200], y[:200]).coef_)
+
+def test_sgd_partial_fit_keeps_history():
+    X, y = _dataset()
+    model = SGDClassifier(loss='log_loss', random_state=0)
+    model.partial_fit(X[:200], y[:200], classes=np.array([0, 1]))
+    assert not refits_on_history(model)
+    
+    updated = extend_model(model, X[200:], y[200:])
+    assert updated is not model
+    assert updated.t_ > model.t_
+    
+    restarted = SGDClassifier(loss='log_loss', random_state=0)
+    restarted.partial_fit(X[200:], y[200:], classes=np.array([0, 1]))
+    assert not np.allclose(updated.coef_, restarted.coef_)
@@ -0,0 +1,69 @@
+import threading
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+import inference
+from inference import ModelHolder, PredictionEngine
+
+FEATURES = ['a', 'b', 'c', 'd']
+
+def _forest(**kwargs):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, len(FEATURES)))
+    y = (X[:, 0] - X[:, 1] + rng.normal(scale=0.5, size=len(X)) > 0).astype(int)
+    return RandomForestClassifier(random_state=0, **kwargs).fit(X, y), X
+
+def _assert_matches(engine, model, X):
+    for row in X[:50]:
+        _, probability = engine.predict_vector(row)
+        assert abs(probability - model.predict_proba(row.reshape(1, -1))[0, 1]) < 1e-9
+
+def test_small_forest_is_compiled():
+    model, X = _forest(n_estimators=10, max_depth=4)
+    engine = PredictionEngine(model, None, FEATURES)
+    assert engine.mode == 'compiled_trees'
+    _assert_matches(engine, model, X)
+
+def test_large_forest_skips_compilation(monkeypatch):
+    model, X = _forest(n_estimators=20)
+    
+    def compile_tree_ensemble(ensemble):
+        raise AssertionError("forest over the node budget was compiled")
+    
+    monkeypatch.setattr(inference, 'MAX_COMPILED_NODES', 1000)
+    monkeypatch.setattr(inference, 'compile_tree_ensemble', compile_tree_ensemble)
+    engine = PredictionEngine(model, None, FEATURES)
+    assert engine.mode == 'flat_trees'
+    _assert_matches(engine, model, X)
+
+def test_reload_runs_off_the_calling_thread():
+    old, X = _forest(n_estimators=5, max_depth=3)
+    new, _ = _forest(n_estimators=6, max_depth=3)
+    release = threading.Event()
+    models = iter([old, new])
+    
+    def loader():
+        model = next(models)
+        if model is new:
+            assert release.wait(5)
+        return model, None, FEATURES
+    
+    holder = ModelHolder(loader=loader).load()
+    assert holder.reload_in_background()
+    assert not holder.reload_in_background()
+    assert holder.model is old
+    holder.cache.get_or_compute(dict(zip(FEATURES, X[0])), holder.predict_vector)
+    
+    release.set()
+    for _ in range(500):
+        if holder.model is new and not holder._reloading:
+            break
+        time.sleep(0.01)
+    assert holder.model is new
+    assert holder.cache.stats()['entries'] == 0
+
+def test_memory_footprint_includes_prediction_engine():
+    model, _ = _forest(n_estimators=20, max_depth=6)
+    holder = ModelHolder(loader=lambda: (model, None, FEATURES)).load()
+    assert holder.engine.mode == 'compiled_trees'
+    assert holder.memory_bytes > 50_000
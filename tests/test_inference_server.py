@@ -0,0 +1,105 @@
+import asyncio
+import json
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from inference_server import InferenceServer
+
+FEATURES = ['age', 'chol']
+
+class BrokenModel:
+    classes_ = np.array([0, 1])
+    
+    def predict_proba(self, X):
+        raise RuntimeError("model exploded")
+
+def _server(model=None):
+    X = np.array([[40.0, 200.0], [60.0, 300.0], [50.0, 250.0], [70.0, 220.0]])
+    scaler = StandardScaler().fit(X)
+    if model is None:
+        model = LogisticRegression().fit(scaler.transform(X), [0, 1, 0, 1])
+    return InferenceServer(model, scaler, FEATURES, max_wait_ms=1.0, reload_seconds=0)
+
+async def _request(server, raw):
+    server.batcher.start()
+    listener = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    finally:
+        listener.close()
+        await server.batcher.stop()
+    
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+def _post(body, content_length=None):
+    length = len(body) if content_length is None else content_length
+    return (f"POST /predict HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n").encode() + body
+
+def test_predict_returns_prediction():
+    status, response = asyncio.run(_request(_server(), _post(b'{"age": 55, "chol": 240}')))
+    assert status == 200
+    assert response['prediction'] in (0, 1)
+
+def test_unexpected_model_error_returns_500():
+    status, response = asyncio.run(_request(_server(BrokenModel()), _post(b'{"age": 55, "chol": 240}')))
+    assert status == 500
+    assert 'error' in response
+
+def test_invalid_content_length_returns_400():
+    for length in ('-5', 'abc', '1.5'):
+        status, response = asyncio.run(_request(_server(), _post(b'{}', length)))
+        assert status == 400
+        assert 'Content-Length' in response['error']
+
+def _watch(server, monkeypatch, versions, latest, load_version):
+    import inference_server
+    server.reload_seconds = 0.01
+    versions = iter(versions)
+    monkeypatch.setattr(inference_server, 'current_version', lambda: next(versions, latest))
+    monkeypatch.setattr(inference_server, 'load_version', load_version)
+    
+    async def run():
+        watcher = asyncio.get_running_loop().create_task(server.watch_registry())
+        await asyncio.sleep(0.2)
+        assert not watcher.done()
+        watcher.cancel()
+    
+    asyncio.run(run())
+
+def test_registry_watcher_survives_load_errors(monkeypatch):
+    server = _server()
+    replacement = LogisticRegression().fit([[0.0, 0.0], [1.0, 1.0]], [0, 1])
+    loads = []
+    
+    def load_version(version):
+        loads.append(version)
+        if version == 'broken':
+            assert server.version is None
+            raise RuntimeError("corrupt manifest")
+        return replacement, server.batcher.artifacts[1], FEATURES
+    
+    _watch(server, monkeypatch, ['broken', 'broken'], 'good', load_version)
+    assert loads == ['broken', 'good']
+    assert server.version == 'good'
+    assert server.failed_version is None
+    assert server.batcher.artifacts[0] is replacement
+
+def test_failed_version_is_not_reported_or_retried(monkeypatch):
+    server = _server()
+    serving = server.batcher.artifacts[0]
+    loads = []
+    
+    def load_version(version):
+        loads.append(version)
+        return serving, server.batcher.artifacts[1], ['age', 'cholesterol']
+    
+    _watch(server, monkeypatch, [], 'renamed', load_version)
+    assert loads == ['renamed']
+    assert server.health()['model_version'] is None
+    assert server.health()['failed_version'] == 'renamed'
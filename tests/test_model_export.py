@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from model_export import _shortest_decimal, fold_scaler, verify_folded
+
+def _dataset(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(29, 78, n_rows),
+        rng.integers(94, 200, n_rows),
+        rng.integers(126, 564, n_rows),
+        np.round(rng.uniform(0, 6.2, n_rows), 1),
+        rng.integers(0, 4, n_rows)
+    ]).astype(np.float64)
+    y = ((X[:, 0] - 50) / 10 + X[:, 3] - X[:, 4] + rng.normal(scale=0.5, size=n_rows) > 1).astype(int)
+    return X, y
+
+def _fit(estimator, X, y):
+    X_train, X_test, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    scaler = StandardScaler().fit(X_train)
+    return estimator.fit(scaler.transform(X_train), y_train), scaler, X_train, X_test
+
+def test_shortest_decimal_matches_repr():
+    values = np.random.default_rng(0).uniform(-600, 600, 20000).astype(np.float32)
+    values[:100] = np.round(values[:100], 1)
+    expected = np.array([float(str(value)) for value in values])
+    np.testing.assert_array_equal(_shortest_decimal(values), expected)
+
+def _assert_folded(model, scaler, X_train, X_test):
+    folded = fold_scaler(model, scaler)
+    for X in (X_train, X_test):
+        ok, max_diff, agreement = verify_folded(model, scaler, folded, X)
+        assert ok, f"max abs difference {max_diff:.2e}"
+        assert agreement == 1.0
+
+def test_random_forest_fold_matches_on_held_out_rows():
+    X, y = _dataset()
+    _assert_folded(*_fit(RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0), X, y))
+
+def test_xgboost_fold_matches_on_held_out_rows():
+    xgboost = pytest.importorskip('xgboost')
+    X, y = _dataset()
+    _assert_folded(*_fit(xgboost.XGBClassifier(n_estimators=40, max_depth=4, random_state=0), X, y))
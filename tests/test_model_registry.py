@@ -0,0 +1,39 @@
+import os
+import pickle
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from flat_trees import export_model
+from model_artifact import save_artifact
+from model_loading import load_model, load_pickled_model
+from model_registry import load_version_pickles, publish_version
+from score import load_scoring_model
+
+FEATURES = ['a', 'b', 'c']
+
+@pytest.fixture
+def compacted_version(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, len(FEATURES)))
+    model = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=0).fit(X, X[:, 0] > 0)
+    
+    def write(path):
+        with open(os.path.join(path, 'feature_names.pkl'), 'wb') as f:
+            pickle.dump(FEATURES, f)
+        save_artifact(export_model(model), FEATURES, os.path.join(path, 'model.hdpm'))
+    
+    return publish_version(write, {'source': 'forest compaction', 'compacted': True}), X
+
+def test_compacted_version_has_no_pickled_estimator(compacted_version):
+    version, _ = compacted_version
+    with pytest.raises(ValueError):
+        load_version_pickles(version)
+    assert load_pickled_model() == (None, None, None)
+
+def test_scoring_uses_the_served_artifact(compacted_version):
+    _, X = compacted_version
+    served, _, _ = load_model()
+    scored, _, feature_names = load_scoring_model()
+    assert feature_names == FEATURES
+    np.testing.assert_array_equal(scored.predict_proba(X), served.predict_proba(X))
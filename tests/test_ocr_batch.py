@@ -0,0 +1,22 @@
+import csv
+import json
+import pytest
+from ocr_batch import OUTPUT_COLUMNS, completed_reports
+
+STATUSES = {'a.png': 'ok', 'b.png': 'insufficient', 'c.png': 'no_text', 'd.png': 'no_parameters', 'e.png': 'error'}
+
+@pytest.mark.parametrize('suffix', ['.csv', '.jsonl'])
+def test_completed_reports_retries_errors(tmp_path, suffix):
+    path = tmp_path / f"results{suffix}"
+    rows = [{'file': name, 'status': status} for name, status in STATUSES.items()]
+    with open(path, 'w', newline='') as f:
+        if suffix == '.csv':
+            writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            f.writelines(json.dumps(row) + '\n' for row in rows)
+        f.write('f.png,ok' if suffix == '.csv' else '{"file": "f.png", "sta')
+    
+    assert completed_reports(str(path)) == {'a.png', 'b.png', 'c.png', 'd.png'}
+    assert path.read_bytes().endswith(b'\n')
@@ -0,0 +1,24 @@
+from utils.ocr_cache import OCRResultCache, cache_key, shared_cache
+
+def test_shared_cache_is_one_instance_per_directory(tmp_path):
+    first = shared_cache(str(tmp_path / 'ocr'))
+    assert shared_cache(str(tmp_path / 'ocr')) is first
+    assert shared_cache(str(tmp_path / 'other')) is not first
+
+def test_running_size_is_kept_between_puts(tmp_path, monkeypatch):
+    cache = shared_cache(str(tmp_path / 'ocr'))
+    cache.put(cache_key(b'first', {}), {'text': 'a'})
+    
+    def walk():
+        raise AssertionError("cache directory walked on a later put")
+    
+    monkeypatch.setattr(cache, '_entries', walk)
+    shared_cache(str(tmp_path / 'ocr')).put(cache_key(b'second', {}), {'text': 'b'})
+    assert cache._current_bytes > 0
+
+def test_eviction_keeps_cache_under_limit(tmp_path):
+    cache = OCRResultCache(str(tmp_path / 'ocr'), max_bytes=2000)
+    for i in range(50):
+        cache.put(cache_key(str(i).encode(), {}), {'text': 'x' * 50})
+    assert cache.stats()['bytes'] <= 2000
+    assert cache.evictions > 0
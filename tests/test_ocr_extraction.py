@@ -0,0 +1,152 @@
+import random
+import re
+import pytest
+from utils.ocr_parsing import HEALTH_PARAMETER_EXTRACTOR
+
+LEGACY_PATTERNS = {
+    'age': [
+        r'(?:age|AGE)[\s:]*(\d{1,3})',
+        r'(\d{1,3})\s*(?:years?|yrs?|yo)',
+        r'age[\s:]*(\d{1,3})',
+        r'(\d{1,3})\s*years?\s*old',
+        r'(\d{1,3})\s*yo'
+    ],
+    'sex': [
+        r'(?:sex|gender|SEX|GENDER)[\s:]*([mfMF]|male|female|Male|Female)',
+        r'(male|female|Male|Female)',
+        r'([mfMF])'
+    ],
+    'chest_pain': [
+        r'(?:chest pain|cp|CP)[\s:]*(\d)',
+        r'chest[\s]*pain[\s:]*(\d)',
+        r'cp[\s:]*(\d)'
+    ],
+    'blood_pressure': [
+        r'(?:blood pressure|bp|BP|trestbps)[\s:]*(\d{2,3})',
+        r'bp[\s:]*(\d{2,3})',
+        r'pressure[\s:]*(\d{2,3})',
+        r'(\d{2,3})\s*mmhg',
+        r'(\d{2,3})\s*mmHg',
+        r'systolic[\s:]*(\d{2,3})',
+        r'diastolic[\s:]*(\d{2,3})'
+    ],
+    'cholesterol': [
+        r'(?:cholesterol|chol|CHOL)[\s:]*(\d{2,4})',
+        r'chol[\s:]*(\d{2,4})',
+        r'(\d{2,4})\s*mg/dl',
+        r'(\d{2,4})\s*mg/dL',
+        r'total[\s]*cholesterol[\s:]*(\d{2,4})'
+    ],
+    'blood_sugar': [
+        r'(?:blood sugar|fbs|FBS|glucose)[\s:]*(\d{2,3})',
+        r'glucose[\s:]*(\d{2,3})',
+        r'sugar[\s:]*(\d{2,3})',
+        r'(\d{2,3})\s*mg/dl',
+        r'(\d{2,3})\s*mg/dL',
+        r'fasting[\s]*glucose[\s:]*(\d{2,3})'
+    ],
+    'ecg': [
+        r'(?:ecg|ECG|restecg)[\s:]*(\d)',
+        r'ecg[\s:]*(\d)',
+        r'electrocardiogram[\s:]*(\d)',
+        r'resting[\s]*ecg[\s:]*(\d)'
+    ],
+    'heart_rate': [
+        r'(?:heart rate|hr|HR|thalach)[\s:]*(\d{2,3})',
+        r'heart[\s]*rate[\s:]*(\d{2,3})',
+        r'hr[\s:]*(\d{2,3})',
+        r'pulse[\s:]*(\d{2,3})',
+        r'(\d{2,3})\s*bpm',
+        r'max[\s]*heart[\s]*rate[\s:]*(\d{2,3})'
+    ],
+    'angina': [
+        r'(?:angina|exang|EXANG)[\s:]*([01])',
+        r'angina[\s:]*([01])',
+        r'exercise[\s]*angina[\s:]*([01])',
+        r'exercise[\s]*induced[\s]*angina[\s:]*([01])'
+    ],
+    'oldpeak': [
+        r'(?:oldpeak|ST depression)[\s:]*(\d+\.?\d*)',
+        r'st[\s]*depression[\s:]*(\d+\.?\d*)',
+        r'oldpeak[\s:]*(\d+\.?\d*)',
+        r'(\d+\.?\d*)\s*mm'
+    ],
+    'slope': [
+        r'(?:slope|SLOPE)[\s:]*(\d)',
+        r'slope[\s:]*(\d)',
+        r'st[\s]*slope[\s:]*(\d)'
+    ],
+    'vessels': [
+        r'(?:vessels|ca|CA|major vessels)[\s:]*(\d)',
+        r'vessels[\s:]*(\d)',
+        r'major[\s]*vessels[\s:]*(\d)',
+        r'coronary[\s]*vessels[\s:]*(\d)'
+    ],
+    'thalassemia': [
+        r'(?:thal|thalassemia|THAL)[\s:]*(\d)',
+        r'thal[\s:]*(\d)',
+        r'thalassemia[\s:]*(\d)'
+    ]
+}
+
+def legacy_parse(text):
+    parameters = {}
+    for param, pattern_list in LEGACY_PATTERNS.items():
+        for pattern in pattern_list:
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                value = match.group(1)
+                if param == 'sex':
+                    parameters[param] = 1 if value.lower() in ['m', 'male'] else 0
+                else:
+                    parameters[param] = float(value)
+                break
+    return parameters
+
+def parse(text):
+    return {param: found['value'] for param, found in HEALTH_PARAMETER_EXTRACTOR.extract(text).items()}
+
+WORDS = [
+    'age', 'Age:', 'years', 'yo', 'years old', 'sex', 'Gender:', 'male', 'Female', 'M', 'F',
+    'chest pain', 'chest  pain', 'chestpain', 'Chest\tPain', 'CP', 'cp:',
+    'blood pressure', 'blood  pressure', 'BP', 'trestbps', 'pressure', 'mmHg', 'systolic', 'diastolic',
+    'cholesterol', 'Total Cholesterol', 'total\ncholesterol', 'chol', 'mg/dl', 'mg/dL',
+    'blood sugar', 'blood  sugar', 'FBS', 'glucose', 'fasting glucose', 'sugar',
+    'ECG', 'restecg', 'resting ecg', 'electrocardiogram',
+    'heart rate', 'heart  rate', 'heartrate', 'HR', 'thalach', 'max heart rate', 'pulse', 'bpm',
+    'angina', 'exang', 'exercise induced angina',
+    'oldpeak', 'ST depression', 'ST  depression', 'stdepression', 'mm',
+    'slope', 'ST slope', 'vessels', 'CA', 'major vessels', 'major  vessels', 'thal', 'thalassemia',
+    'Patient', 'Report', 'Name', 'Date', 'the', 'of', 'result', 'normal', 'scan', 'Âge', 'Größe', ':', '-', '(', ')', '.'
+]
+SEPARATORS = [' ', '', ': ', '\n', '  ', '\t', ' ' * 40]
+
+def _number(rng):
+    return rng.choice([
+        str(rng.randint(0, 9)), str(rng.randint(10, 99)), str(rng.randint(100, 400)),
+        str(rng.randint(1000, 99999)), f"{rng.random() * 5:.1f}", f"{rng.randint(1, 9)}.{rng.randint(1, 9)}.{rng.randint(1, 9)}"
+    ])
+
+def _report(rng):
+    tokens = [rng.choice(WORDS) if rng.random() < 0.6 else _number(rng) for _ in range(rng.randint(1, 30))]
+    return ''.join(token + rng.choice(SEPARATORS) for token in tokens)
+
+@pytest.mark.parametrize('text, expected', [
+    ("chest  pain: 2 then cp: 1", 1.0),
+    ("chest pain: 2 then cp: 1", 2.0),
+    ("chestpain 3", 3.0)
+])
+def test_literal_keywords_outrank_whitespace_variants(text, expected):
+    assert parse(text)['chest_pain'] == expected
+    assert legacy_parse(text)['chest_pain'] == expected
+
+def test_suffix_whitespace_is_unbounded():
+    text = "45" + " " * 100 + "years"
+    assert parse(text)['age'] == legacy_parse(text)['age'] == 45.0
+
+@pytest.mark.parametrize('seed', range(4))
+def test_matches_legacy_pattern_loop(seed):
+    rng = random.Random(seed)
+    for _ in range(2500):
+        text = _report(rng)
+        assert list(parse(text).items()) == list(legacy_parse(text).items()), text
@@ -0,0 +1,49 @@
+import os
+from prediction_cache import PredictionCache
+
+FEATURES = ['age', 'oldpeak']
+
+def _cache(tmp_path, **kwargs):
+    artifact = tmp_path / 'model.pkl'
+    artifact.write_bytes(b'v1')
+    return PredictionCache(FEATURES, artifact_paths=(str(artifact),), check_interval=0, **kwargs), artifact
+
+def _touch(artifact, data):
+    artifact.write_bytes(data)
+    stat = os.stat(artifact)
+    os.utime(artifact, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def test_key_is_exact_input_vector(tmp_path):
+    cache, _ = _cache(tmp_path)
+    seen = []
+    
+    def compute(vector):
+        seen.append(vector)
+        return tuple(vector)
+    
+    assert cache.get_or_compute({'age': 54.4, 'oldpeak': 1.26}, compute) == (54.4, 1.26)
+    assert cache.get_or_compute({'age': 54.4, 'oldpeak': 1.31}, compute) == (54.4, 1.31)
+    assert cache.get_or_compute({'age': 54.4, 'oldpeak': 1.26}, compute) == (54.4, 1.26)
+    assert cache.get_or_compute({'age': 54.4, 'oldpeak': 1.26, 'ignored': 3}, compute) == (54.4, 1.26)
+    assert seen == [[54.4, 1.26], [54.4, 1.31]]
+    assert cache.stats()['hits'] == 2
+
+def test_artifact_change_clears_entries_and_reloads(tmp_path):
+    reloads = []
+    cache, artifact = _cache(tmp_path, on_change=lambda: reloads.append(True))
+    cache.get_or_compute({'age': 50, 'oldpeak': 1.0}, lambda vector: 'old')
+    
+    _touch(artifact, b'v2')
+    assert cache.get_or_compute({'age': 50, 'oldpeak': 1.0}, lambda vector: 'new') == 'new'
+    assert reloads == [True]
+    assert cache.stats()['invalidations'] == 1
+
+def test_result_computed_before_invalidation_is_not_stored(tmp_path):
+    cache, artifact = _cache(tmp_path)
+    
+    def compute(vector):
+        _touch(artifact, b'v2')
+        return 'stale'
+    
+    cache.get_or_compute({'age': 50, 'oldpeak': 1.0}, compute)
+    assert cache.get(cache.canonicalize({'age': 50, 'oldpeak': 1.0})) is None
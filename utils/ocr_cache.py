@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+OCR_CACHE_DIR = 'data/cache/ocr'
+OCR_CACHE_MAX_BYTES = int(float(os.getenv('HEART_OCR_CACHE_MB', 256)) * 1024 * 1024)
+
+def cache_key(image_bytes, signature):
+    digest = hashlib.sha256()
+    digest.update(json.dumps(signature, sort_keys=True).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+class OCRResultCache:
+    
+    def __init__(self, path=OCR_CACHE_DIR, max_bytes=OCR_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._current_bytes = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def entry_path(self, key):
+        return os.path.join(self.path, key[:2], key + '.json')
+    
+    def _entries(self):
+        entries = []
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, os.path.join(root, name)))
+        return entries
+    
+    def get(self, key):
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return value
+    
+    def put(self, key, value):
+        if self.max_bytes <= 0:
+            return
+        
+        path = self.entry_path(key)
+        data = json.dumps(dict(value, cached_at=datetime.now().isoformat(timespec='seconds'))).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Could not cache OCR result: {e}")
+                return
+            
+            if self._current_bytes is None:
+                self._current_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._current_bytes += len(data)
+            if self._current_bytes > self.max_bytes:
+                self._evict()
+    
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._current_bytes = total
+    
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._current_bytes = 0
+    
+    def stats(self):
+        entries = self._entries()
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+def shared_cache(path=OCR_CACHE_DIR, max_bytes=OCR_CACHE_MAX_BYTES):
+    key = (os.path.abspath(path), max_bytes)
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = _shared_caches[key] = OCRResultCache(path, max_bytes)
+        return cache
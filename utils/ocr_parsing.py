@@ -0,0 +1,161 @@
+import re
+
+HEALTH_PARAMETER_RULES = [
+    ('age', 0, 'prefix', ['age'], r'(\d{1,3})'),
+    ('age', 1, 'suffix', ['years', 'year', 'yrs', 'yr', 'yo'], r'(\d{1,3})'),
+    ('sex', 0, 'prefix', ['sex', 'gender'], r'([mf]|male|female)'),
+    ('sex', 1, 'bare', ['male', 'female'], None),
+    ('chest_pain', 0, 'prefix', ['chest pain', 'cp'], r'(\d)'),
+    ('chest_pain', 1, 'prefix', [r'chest\s*pain'], r'(\d)'),
+    ('blood_pressure', 0, 'prefix', ['blood pressure', 'bp', 'trestbps'], r'(\d{2,3})'),
+    ('blood_pressure', 2, 'prefix', ['pressure'], r'(\d{2,3})'),
+    ('blood_pressure', 3, 'suffix', ['mmhg'], r'(\d{2,3})'),
+    ('blood_pressure', 5, 'prefix', ['systolic'], r'(\d{2,3})'),
+    ('blood_pressure', 6, 'prefix', ['diastolic'], r'(\d{2,3})'),
+    ('cholesterol', 0, 'prefix', ['cholesterol', 'chol'], r'(\d{2,4})'),
+    ('cholesterol', 2, 'suffix', ['mg/dl'], r'(\d{2,4})'),
+    ('blood_sugar', 0, 'prefix', ['blood sugar', 'fbs', 'glucose'], r'(\d{2,3})'),
+    ('blood_sugar', 2, 'prefix', ['sugar'], r'(\d{2,3})'),
+    ('blood_sugar', 3, 'suffix', ['mg/dl'], r'(\d{2,3})'),
+    ('ecg', 0, 'prefix', ['ecg', 'restecg'], r'(\d)'),
+    ('ecg', 2, 'prefix', ['electrocardiogram'], r'(\d)'),
+    ('heart_rate', 0, 'prefix', ['heart rate', 'hr', 'thalach'], r'(\d{2,3})'),
+    ('heart_rate', 1, 'prefix', [r'heart\s*rate'], r'(\d{2,3})'),
+    ('heart_rate', 3, 'prefix', ['pulse'], r'(\d{2,3})'),
+    ('heart_rate', 4, 'suffix', ['bpm'], r'(\d{2,3})'),
+    ('angina', 0, 'prefix', ['angina', 'exang'], r'([01])'),
+    ('oldpeak', 0, 'prefix', ['oldpeak', 'st depression'], r'(\d+\.?\d*)'),
+    ('oldpeak', 1, 'prefix', [r'st\s*depression'], r'(\d+\.?\d*)'),
+    ('oldpeak', 3, 'suffix', ['mm'], r'(\d+\.?\d*)'),
+    ('slope', 0, 'prefix', ['slope'], r'(\d)'),
+    ('vessels', 0, 'prefix', ['vessels', 'ca', 'major vessels'], r'(\d)'),
+    ('thalassemia', 0, 'prefix', ['thal', 'thalassemia'], r'(\d)')
+]
+
+SEX_LETTER_RULE = ('sex', 2, 'letter', re.compile(r'([mf])', re.IGNORECASE))
+
+FLEXIBLE_SPACE = r'\s*'
+
+class HealthParameterExtractor:
+    
+    def __init__(self, rules=HEALTH_PARAMETER_RULES):
+        keywords = {}
+        for param, priority, kind, words, value_pattern in rules:
+            for word in words:
+                keywords.setdefault(word, []).append((param, priority, kind, self._compile_value(kind, value_pattern)))
+        
+        self.parameters = list(dict.fromkeys(rule[0] for rule in rules))
+        self.top_priority = {param: min(rule[1] for rule in rules if rule[0] == param) for param in self.parameters}
+        self.keywords = keywords
+        self.matchers = {word: re.compile(self._keyword_pattern(word), re.IGNORECASE) for word in keywords}
+        
+        forms = {}
+        for word in sorted(keywords, key=lambda word: len(self._normalise(word)), reverse=True):
+            forms.setdefault(self._normalise(word), []).append(word)
+        self.candidates = {
+            form: [word for other, words in forms.items() if form.startswith(other) for word in words]
+            for form in forms
+        }
+        
+        first_chars = re.escape(''.join(sorted({self._tokens(word)[0] for word in keywords})))
+        scan = f"(?=[{first_chars}])(?=({self._trie_pattern(keywords)}))"
+        self.pattern = re.compile(scan, re.IGNORECASE)
+        self.ascii_pattern = re.compile(scan)
+    
+    @staticmethod
+    def _tokens(word):
+        return re.findall(r'\\s\*|.', word.lower())
+    
+    @classmethod
+    def _normalise(cls, word):
+        return ''.join(token for token in cls._tokens(word) if token != FLEXIBLE_SPACE and not token.isspace())
+    
+    @classmethod
+    def _keyword_pattern(cls, word):
+        return ''.join(token if token == FLEXIBLE_SPACE else re.escape(token) for token in cls._tokens(word))
+    
+    @classmethod
+    def _trie_pattern(cls, words):
+        trie = {}
+        for word in words:
+            node = trie
+            for token in cls._tokens(word):
+                node = node.setdefault(FLEXIBLE_SPACE if token.isspace() else token, {})
+            node[''] = {}
+        
+        def render(node):
+            branches = [
+                (token if token == FLEXIBLE_SPACE else re.escape(token)) + render(child)
+                for token, child in sorted(node.items()) if token
+            ]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return f"(?:{body})?" if '' in node else body
+        return render(trie)
+    
+    @staticmethod
+    def _compile_value(kind, value_pattern):
+        if kind == 'prefix':
+            return re.compile(r'[\s:]*' + value_pattern, re.IGNORECASE)
+        if kind == 'suffix':
+            return re.compile(value_pattern + '$', re.IGNORECASE)
+        return None
+    
+    @staticmethod
+    def _resolve(text, start, end, kind, value):
+        if kind == 'prefix':
+            found = value.match(text, end)
+        elif kind == 'suffix':
+            value_end = start
+            while value_end > 0 and text[value_end - 1].isspace():
+                value_end -= 1
+            value_start = value_end
+            while value_start > 0 and (text[value_start - 1].isdecimal() or text[value_start - 1] == '.'):
+                value_start -= 1
+            found = value.search(text, value_start, value_end)
+        else:
+            return text[start:end], (start, end)
+        return (found.group(1), found.span(1)) if found else (None, None)
+    
+    def extract(self, text):
+        best = {}
+        settled = 0
+        matches = self.ascii_pattern.finditer(text.lower()) if text.isascii() else self.pattern.finditer(text)
+        for match in matches:
+            start = match.start(1)
+            for keyword in self.candidates.get(''.join(match.group(1).lower().split()), self.keywords):
+                rules = [rule for rule in self.keywords[keyword] if rule[0] not in best or rule[1] < best[rule[0]]['priority']]
+                if not rules:
+                    continue
+                keyword_match = self.matchers[keyword].match(text, start)
+                if keyword_match is None:
+                    continue
+                for param, priority, kind, value in rules:
+                    raw, span = self._resolve(text, start, keyword_match.end(), kind, value)
+                    if raw is None:
+                        continue
+                    best[param] = {'raw': raw, 'span': span, 'rule': f"{kind}:{keyword}", 'priority': priority}
+                    settled += priority == self.top_priority[param]
+            if settled == len(self.parameters):
+                break
+        
+        param, priority, kind, letter = SEX_LETTER_RULE
+        if param not in best:
+            found = letter.search(text)
+            if found:
+                best[param] = {'raw': found.group(1), 'span': found.span(1), 'rule': kind, 'priority': priority}
+        
+        extracted = {}
+        for param in self.parameters:
+            if param not in best:
+                continue
+            found = best[param]
+            if param == 'sex':
+                value = 1 if found['raw'].lower() in ('m', 'male') else 0
+            else:
+                value = float(found['raw'])
+            extracted[param] = {'value': value, 'text': found['raw'], 'span': found['span'], 'rule': found['rule']}
+        return extracted
+
+HEALTH_PARAMETER_EXTRACTOR = HealthParameterExtractor()
@@ -1,14 +1,141 @@
 import cv2
 import pytesseract
 import numpy as np
-import re
 import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from PIL import Image
 import io
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from utils.ocr_cache import OCR_CACHE_DIR, cache_key, shared_cache
+    from utils.ocr_parsing import HEALTH_PARAMETER_EXTRACTOR, HEALTH_PARAMETER_RULES
+except ImportError:
+    from ocr_cache import OCR_CACHE_DIR, cache_key, shared_cache
+    from ocr_parsing import HEALTH_PARAMETER_EXTRACTOR, HEALTH_PARAMETER_RULES
+
+OCR_CONFIGS = [
+    r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:;()[]{}%/- ',
+    r'--oem 3 --psm 3',
+    r'--oem 3 --psm 4',
+    r'--oem 3 --psm 6',
+    r'--oem 3 --psm 8'
+]
+
+PREPROCESS_VERSION = 1
+
+OCR_WORKERS = int(os.getenv('HEART_OCR_WORKERS', min(len(OCR_CONFIGS), os.cpu_count() or 1)))
+EARLY_EXIT_PARAMETERS = int(os.getenv('HEART_OCR_EARLY_EXIT', 8))
+
+OCR_MODES = ('adaptive', 'concurrent')
+OCR_MODE = os.getenv('HEART_OCR_MODE', 'adaptive')
+MIN_CONFIDENCE = float(os.getenv('HEART_OCR_MIN_CONFIDENCE', 70))
+MIN_PARAMETERS = int(os.getenv('HEART_OCR_MIN_PARAMETERS', 5))
+OCR_STATS_PATH = 'data/cache/ocr_config_stats.json'
+OCR_DEBUG = os.getenv('HEART_OCR_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+def words_to_text(data):
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data['text']):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not str(word).strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, []).append(str(word).strip())
+        confidences.append(confidence)
+    
+    text = '\n'.join(' '.join(words) for _, words in sorted(lines.items()))
+    return text, (sum(confidences) / len(confidences) if confidences else 0.0)
+
+class ConfigStats:
+    
+    def __init__(self, path=OCR_STATS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = self._read()
+        self.pending = {}
+    
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def score(self, config):
+        entry = self.stats.get(config, {})
+        return (entry.get('accepted', 0) + 1) / (entry.get('runs', 0) + 2)
+    
+    def order(self, configs):
+        return sorted(configs, key=lambda config: -self.score(config))
+    
+    def record(self, config, confidence, found, accepted):
+        with self.lock:
+            entry = self.stats.setdefault(config, {'runs': 0, 'accepted': 0, 'mean_confidence': 0.0, 'mean_parameters': 0.0})
+            entry['runs'] += 1
+            entry['accepted'] += int(accepted)
+            entry['mean_confidence'] += (confidence - entry['mean_confidence']) / entry['runs']
+            entry['mean_parameters'] += (found - entry['mean_parameters']) / entry['runs']
+            
+            delta = self.pending.setdefault(config, {'runs': 0, 'accepted': 0, 'confidence': 0.0, 'parameters': 0.0})
+            delta['runs'] += 1
+            delta['accepted'] += int(accepted)
+            delta['confidence'] += confidence
+            delta['parameters'] += found
+    
+    def _merge(self, stats):
+        for config, delta in self.pending.items():
+            entry = stats.setdefault(config, {'runs': 0, 'accepted': 0, 'mean_confidence': 0.0, 'mean_parameters': 0.0})
+            runs = entry['runs'] + delta['runs']
+            entry['mean_confidence'] = (entry['mean_confidence'] * entry['runs'] + delta['confidence']) / runs
+            entry['mean_parameters'] = (entry['mean_parameters'] * entry['runs'] + delta['parameters']) / runs
+            entry['runs'] = runs
+            entry['accepted'] += delta['accepted']
+        return stats
+    
+    def save(self):
+        with self.lock:
+            if not self.pending:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path + '.lock', 'w') as lock_file:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    stats = self._merge(self._read())
+                    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w') as f:
+                        json.dump(stats, f, indent=2)
+                    os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Could not save OCR config statistics: {e}")
+                return
+            
+            self.stats = stats
+            self.pending = {}
+
 class OCRProcessor:
     
-    def __init__(self):
+    def __init__(self, max_workers=OCR_WORKERS, early_exit_parameters=EARLY_EXIT_PARAMETERS, mode=OCR_MODE,
+                 min_confidence=MIN_CONFIDENCE, min_parameters=MIN_PARAMETERS, stats_path=OCR_STATS_PATH,
+                 cache_dir=OCR_CACHE_DIR):
+        if mode not in OCR_MODES:
+            raise ValueError(f"Unknown OCR mode '{mode}', expected one of {OCR_MODES}")
+        self.max_workers = max(1, max_workers)
+        self.early_exit_parameters = early_exit_parameters
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self.min_parameters = min_parameters
+        self.config_stats = ConfigStats(stats_path) if mode == 'adaptive' else None
+        self.cache = shared_cache(cache_dir) if cache_dir else None
+        self._signature = None
         try:
             pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
         except:
@@ -51,183 +178,187 @@ class OCRProcessor:
         
         return cleaned
     
-    def extract_text(self, image):
+    def _run_config(self, processed_image, config):
+        text = pytesseract.image_to_string(processed_image, config=config).strip()
+        found = len(self.parse_health_parameters(text)) if self.early_exit_parameters and text else 0
+        return text, found
+    
+    def _extract_concurrent(self, processed_image, configs):
+        texts = {}
+        passes = 0
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(configs)))
+        pending = {executor.submit(self._run_config, processed_image, config): i for i, config in enumerate(configs)}
         try:
-            processed_image = self.preprocess_image(image)
-            
-            configs = [
-                r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:;()[]{}%/- ',
-                r'--oem 3 --psm 3',
-                r'--oem 3 --psm 4',
-                r'--oem 3 --psm 6',
-                r'--oem 3 --psm 8'
-            ]
-            
-            best_text = ""
-            max_length = 0
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        text, found = future.result()
+                    except Exception:
+                        continue
+                    passes += 1
+                    
+                    if self.early_exit_parameters and found >= self.early_exit_parameters:
+                        return text, passes
+                    texts[i] = text
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        best_text = ""
+        for i in sorted(texts):
+            if len(texts[i]) > len(best_text):
+                best_text = texts[i]
+        return best_text, passes
+    
+    def _extract_adaptive(self, processed_image, configs):
+        best = None
+        passes = 0
+        
+        for config in self.config_stats.order(configs):
+            try:
+                data = pytesseract.image_to_data(processed_image, config=config, output_type=pytesseract.Output.DICT)
+            except Exception:
+                continue
+            passes += 1
             
-            for config in configs:
-                try:
-                    text = pytesseract.image_to_string(processed_image, config=config)
-                    if len(text.strip()) > max_length:
-                        max_length = len(text.strip())
-                        best_text = text.strip()
-                except:
-                    continue
+            text, confidence = words_to_text(data)
+            found = len(self.parse_health_parameters(text)) if text else 0
+            accepted = confidence >= self.min_confidence and found >= self.min_parameters
+            self.config_stats.record(config, confidence, found, accepted)
             
-            return best_text
+            result = {'text': text, 'confidence': confidence, 'config': config, 'parameters_found': found}
+            if best is None or (found, confidence) > (best['parameters_found'], best['confidence']):
+                best = result
+            if accepted:
+                break
+        
+        self.config_stats.save()
+        if best is None:
+            return {'text': "", 'confidence': None, 'config': None, 'parameters_found': 0, 'passes': passes}
+        return dict(best, passes=passes)
+    
+    def extract(self, image, configs=OCR_CONFIGS):
+        try:
+            processed_image = self.preprocess_image(image)
+            if self.mode == 'adaptive':
+                return self._extract_adaptive(processed_image, configs)
             
+            text, passes = self._extract_concurrent(processed_image, configs)
+            return {'text': text, 'confidence': None, 'config': None, 'parameters_found': None, 'passes': passes}
+        
         except Exception as e:
             print(f"Error in OCR: {e}")
-            return ""
+            return {'text': "", 'confidence': None, 'config': None, 'parameters_found': 0, 'passes': 0}
+    
+    def extract_text(self, image, configs=OCR_CONFIGS):
+        return self.extract(image, configs)['text']
+    
+    def extract_health_parameters(self, text):
+        return HEALTH_PARAMETER_EXTRACTOR.extract(text)
     
-    def parse_health_parameters(self, text):
-        parameters = {}
+    def parse_health_parameters(self, text, debug=OCR_DEBUG):
+        extracted = self.extract_health_parameters(text)
         
-        print(f"DEBUG: Extracted text length: {len(text)}")
-        print(f"DEBUG: First 200 chars: {text[:200]}...")
+        if debug:
+            print(f"DEBUG: Extracted text length: {len(text)}")
+            print(f"DEBUG: First 200 chars: {text[:200]}...")
+            for param, found in extracted.items():
+                print(f"DEBUG: Found {param} = {found['text']} at {found['span']} ({found['rule']})")
+            print(f"DEBUG: Total parameters extracted: {len(extracted)}")
         
-        patterns = {
-            'age': [
-                r'(?:age|AGE)[\s:]*(\d{1,3})',
-                r'(\d{1,3})\s*(?:years?|yrs?|yo)',
-                r'age[\s:]*(\d{1,3})',
-                r'(\d{1,3})\s*years?\s*old',
-                r'(\d{1,3})\s*yo'
-            ],
-            'sex': [
-                r'(?:sex|gender|SEX|GENDER)[\s:]*([mfMF]|male|female|Male|Female)',
-                r'(male|female|Male|Female)',
-                r'([mfMF])'
-            ],
-            'chest_pain': [
-                r'(?:chest pain|cp|CP)[\s:]*(\d)',
-                r'chest[\s]*pain[\s:]*(\d)',
-                r'cp[\s:]*(\d)'
-            ],
-            'blood_pressure': [
-                r'(?:blood pressure|bp|BP|trestbps)[\s:]*(\d{2,3})',
-                r'bp[\s:]*(\d{2,3})',
-                r'pressure[\s:]*(\d{2,3})',
-                r'(\d{2,3})\s*mmhg',
-                r'(\d{2,3})\s*mmHg',
-                r'systolic[\s:]*(\d{2,3})',
-                r'diastolic[\s:]*(\d{2,3})'
-            ],
-            'cholesterol': [
-                r'(?:cholesterol|chol|CHOL)[\s:]*(\d{2,4})',
-                r'chol[\s:]*(\d{2,4})',
-                r'(\d{2,4})\s*mg/dl',
-                r'(\d{2,4})\s*mg/dL',
-                r'total[\s]*cholesterol[\s:]*(\d{2,4})'
-            ],
-            'blood_sugar': [
-                r'(?:blood sugar|fbs|FBS|glucose)[\s:]*(\d{2,3})',
-                r'glucose[\s:]*(\d{2,3})',
-                r'sugar[\s:]*(\d{2,3})',
-                r'(\d{2,3})\s*mg/dl',
-                r'(\d{2,3})\s*mg/dL',
-                r'fasting[\s]*glucose[\s:]*(\d{2,3})'
-            ],
-            'ecg': [
-                r'(?:ecg|ECG|restecg)[\s:]*(\d)',
-                r'ecg[\s:]*(\d)',
-                r'electrocardiogram[\s:]*(\d)',
-                r'resting[\s]*ecg[\s:]*(\d)'
-            ],
-            'heart_rate': [
-                r'(?:heart rate|hr|HR|thalach)[\s:]*(\d{2,3})',
-                r'heart[\s]*rate[\s:]*(\d{2,3})',
-                r'hr[\s:]*(\d{2,3})',
-                r'pulse[\s:]*(\d{2,3})',
-                r'(\d{2,3})\s*bpm',
-                r'max[\s]*heart[\s]*rate[\s:]*(\d{2,3})'
-            ],
-            'angina': [
-                r'(?:angina|exang|EXANG)[\s:]*([01])',
-                r'angina[\s:]*([01])',
-                r'exercise[\s]*angina[\s:]*([01])',
-                r'exercise[\s]*induced[\s]*angina[\s:]*([01])'
-            ],
-            'oldpeak': [
-                r'(?:oldpeak|ST depression)[\s:]*(\d+\.?\d*)',
-                r'st[\s]*depression[\s:]*(\d+\.?\d*)',
-                r'oldpeak[\s:]*(\d+\.?\d*)',
-                r'(\d+\.?\d*)\s*mm'
-            ],
-            'slope': [
-                r'(?:slope|SLOPE)[\s:]*(\d)',
-                r'slope[\s:]*(\d)',
-                r'st[\s]*slope[\s:]*(\d)'
-            ],
-            'vessels': [
-                r'(?:vessels|ca|CA|major vessels)[\s:]*(\d)',
-                r'vessels[\s:]*(\d)',
-                r'major[\s]*vessels[\s:]*(\d)',
-                r'coronary[\s]*vessels[\s:]*(\d)'
-            ],
-            'thalassemia': [
-                r'(?:thal|thalassemia|THAL)[\s:]*(\d)',
-                r'thal[\s:]*(\d)',
-                r'thalassemia[\s:]*(\d)'
-            ]
-        }
+        return {param: found['value'] for param, found in extracted.items()}
+    
+    def ocr_signature(self):
+        if self._signature is None:
+            try:
+                tesseract_version = str(pytesseract.get_tesseract_version())
+            except Exception:
+                tesseract_version = None
+            self._signature = {
+                'preprocess_version': PREPROCESS_VERSION,
+                'tesseract': tesseract_version,
+                'mode': self.mode,
+                'configs': OCR_CONFIGS,
+                'thresholds': [self.early_exit_parameters, self.min_confidence, self.min_parameters],
+                'rules': repr(HEALTH_PARAMETER_RULES)
+            }
+        return self._signature
+    
+    def _read_image_bytes(self, uploaded_file):
+        if isinstance(uploaded_file, (str, os.PathLike)):
+            with open(uploaded_file, 'rb') as f:
+                return f.read()
+        if hasattr(uploaded_file, 'getvalue'):
+            return uploaded_file.getvalue()
         
-        for param, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    value = match.group(1)
-                    try:
-                        if param == 'sex':
-                            if value.lower() in ['m', 'male']:
-                                parameters[param] = 1
-                            else:
-                                parameters[param] = 0
-                        else:
-                            parameters[param] = float(value)
-                        print(f"DEBUG: Found {param} = {value}")
-                        break
-                    except ValueError:
-                        continue
+        position = uploaded_file.tell()
+        data = uploaded_file.read()
+        uploaded_file.seek(position)
+        return data
+    
+    def _build_result(self, text, parameters, ocr, cached):
+        details = {'confidence': ocr.get('confidence'), 'ocr_passes': ocr.get('passes'), 'cached': cached}
+        
+        if not text.strip():
+            return dict(details, **{
+                'success': False,
+                'status': 'no_text',
+                'extracted_text': '',
+                'parameters': {},
+                'message': "No text could be extracted from the image. Please try with a clearer image."
+            })
+        
+        if not parameters:
+            return dict(details, **{
+                'success': False,
+                'status': 'no_parameters',
+                'extracted_text': text,
+                'parameters': {},
+                'message': "No parameters could be extracted from the image. Please try with a clearer image or use manual input."
+            })
         
-        print(f"DEBUG: Total parameters extracted: {len(parameters)}")
-        return parameters
+        return dict(details, **{
+            'success': True,
+            'status': 'ok',
+            'extracted_text': text,
+            'parameters': parameters,
+            'message': f"Successfully extracted {len(parameters)} parameters"
+        })
     
     def process_image_file(self, uploaded_file):
         try:
-            image = Image.open(uploaded_file)
-            
-            text = self.extract_text(image)
+            data = self._read_image_bytes(uploaded_file)
             
-            if not text.strip():
-                return {
-                    'success': False,
-                    'extracted_text': '',
-                    'parameters': {},
-                    'message': "No text could be extracted from the image. Please try with a clearer image."
-                }
+            key = None
+            if self.cache is not None:
+                key = cache_key(data, self.ocr_signature())
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return self._build_result(cached['text'], cached['parameters'], cached, True)
             
-            parameters = self.parse_health_parameters(text)
+            image = Image.open(io.BytesIO(data))
             
-            if not parameters:
-                return {
-                    'success': False,
-                    'extracted_text': text,
-                    'parameters': {},
-                    'message': "No parameters could be extracted from the image. Please try with a clearer image or use manual input."
-                }
+            ocr = self.extract(image)
+            text = ocr['text']
+            parameters = self.parse_health_parameters(text) if text.strip() else {}
             
-            return {
-                'success': True,
-                'extracted_text': text,
-                'parameters': parameters,
-                'message': f"Successfully extracted {len(parameters)} parameters"
-            }
+            if key is not None and ocr['passes']:
+                self.cache.put(key, {
+                    'text': text,
+                    'parameters': parameters,
+                    'confidence': ocr['confidence'],
+                    'config': ocr['config'],
+                    'passes': ocr['passes']
+                })
             
+            return self._build_result(text, parameters, ocr, False)
+        
         except Exception as e:
             return {
                 'success': False,
+                'status': 'error',
                 'extracted_text': '',
                 'parameters': {},
                 'message': f"Error processing image: {str(e)}"
@@ -249,6 +380,31 @@ NORMAL_RANGES = {
     'thalassemia': (0, 3)
 }
 
+MODEL_FEATURE_NAMES = {
+    'age': 'age',
+    'sex': 'sex',
+    'chest_pain': 'cp',
+    'blood_pressure': 'trestbps',
+    'cholesterol': 'chol',
+    'blood_sugar': 'fbs',
+    'ecg': 'restecg',
+    'heart_rate': 'thalach',
+    'angina': 'exang',
+    'oldpeak': 'oldpeak',
+    'slope': 'slope',
+    'vessels': 'ca',
+    'thalassemia': 'thal'
+}
+
+def to_model_features(parameters):
+    features = {}
+    for param, value in parameters.items():
+        feature = MODEL_FEATURE_NAMES.get(param, param)
+        if param == 'blood_sugar':
+            value = 1 if value > 120 else 0
+        features[feature] = value
+    return features
+
 def validate_parameters(parameters):
     validated = {}
     warnings = []